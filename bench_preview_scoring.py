@@ -0,0 +1,131 @@
+import os
+import random
+import sys
+import time
+
+from monolith import PreviewScorer, find_preview_entry
+
+ENTRY_COUNT = 100_000
+ROUNDS = 5
+
+
+def legacy_find_preview_entry(names: list[str]) -> str | None:
+    img_exts = {'.jpg', '.jpeg', '.png', '.tga'}
+    best_match = None
+    max_score = -20000
+
+    folder_weights = {
+        'levelshots/': 10000,
+        'models/players/': 400,
+        'models/weapons2/': 300,
+        'models/map_objects/mp/': 200,
+        'gfx/menus/': 100,
+        'gfx/ui/': 50
+    }
+
+    for name in names:
+        if name.endswith('/') or any(x in name.lower() for x in ['__macosx', 'thumbs.db']):
+            continue
+
+        full_path_lower = name.lower()
+        base_name = os.path.basename(name).lower()
+        name_no_ext, ext = os.path.splitext(base_name)
+
+        if ext not in img_exts:
+            continue
+
+        score = 1
+
+        for folder, weight in folder_weights.items():
+            if folder in full_path_lower:
+                score += weight
+                break
+
+        if name_no_ext == 'preview':
+            score += 1600
+        elif name_no_ext == 'icon_default':
+            score += 1500
+        elif name_no_ext == 'levelshot':
+            score += 1000
+        elif name_no_ext.startswith('map_'):
+            score += 400
+
+        team_keywords = ['icon_blue', 'icon_red', 'icon_green', '/team/', '_blue', '_red']
+        if any(k in full_path_lower for k in team_keywords):
+            score -= 800
+
+        trash_keywords = [
+            'eye', 'mouth', 'face', 'hand', 'torso', 'arm', 'leg',
+            'hips', 'cap', '_glow', '_spec', '_norm', '_reflect'
+        ]
+        if any(k in name_no_ext for k in trash_keywords):
+            score -= 15000
+
+        if ext.lower() in ['.jpg', '.jpeg']:
+            score += 10
+
+        if score > max_score:
+            max_score = score
+            best_match = name
+
+    return best_match
+
+
+def make_entries(rng: random.Random, count: int) -> list[str]:
+    folders = [
+        "models/players/kyle/", "models/players/Tavion/team/", "models/weapons2/saber/",
+        "models/map_objects/mp/", "gfx/menus/", "gfx/ui/", "textures/ffa_bespin/",
+        "sound/chars/", "scripts/", "maps/", "__MACOSX/textures/", "levelshots/"
+    ]
+    stems = [
+        "torso", "head_blue", "icon_default", "icon_red", "hand_glow", "map_duel",
+        "wall", "floor_spec", "caps", "Preview", "legs", "sky", "shot", "levelshot"
+    ]
+    exts = [".jpg", ".JPG", ".tga", ".png", ".jpeg", ".shader", ".wav", ".md3", ".glm", ".bsp", ""]
+    entries = []
+    for i in range(count):
+        entries.append(f"{rng.choice(folders)}{rng.choice(stems)}{i}{rng.choice(exts)}")
+    return entries
+
+
+def best_time(func, names: list[str]) -> tuple[float, str | None]:
+    best = float("inf")
+    result = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        result = func(names)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main() -> int:
+    rng = random.Random(1)
+    names = make_entries(rng, ENTRY_COUNT)
+    scorer = PreviewScorer()
+
+    start = time.perf_counter()
+    PreviewScorer()
+    compile_time = time.perf_counter() - start
+
+    legacy_time, legacy_result = best_time(legacy_find_preview_entry, names)
+    engine_time, engine_result = best_time(lambda n: find_preview_entry(n, scorer), names)
+
+    # Smaller archives and pathological ones must pick the same entry too.
+    mismatches = 0
+    for size in (0, 1, 10, 100, 1000):
+        for _ in range(50):
+            sample = make_entries(rng, size)
+            if legacy_find_preview_entry(sample) != scorer.best(sample):
+                mismatches += 1
+
+    print(f"entries:        {ENTRY_COUNT}")
+    print(f"rule compile:   {compile_time * 1000:.2f} ms")
+    print(f"legacy loop:    {legacy_time * 1000:.2f} ms  -> {legacy_result}")
+    print(f"rule engine:    {engine_time * 1000:.2f} ms  -> {engine_result}")
+    print(f"speedup:        {legacy_time / engine_time:.1f}x")
+    print(f"mismatches:     {mismatches}")
+    return 0 if legacy_result == engine_result and not mismatches else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
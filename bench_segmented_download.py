@@ -0,0 +1,102 @@
+import hashlib
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from monolith import DownloadStopped, fetch_to_file, make_http_session, partial_download_progress
+
+FILE_SIZE = 48 * 1024 * 1024
+BYTES_PER_SECOND = 8 * 1024 * 1024
+SEGMENTS = 4
+PAYLOAD = os.urandom(FILE_SIZE)
+ETAG = f'"{hashlib.sha256(PAYLOAD).hexdigest()[:16]}"'
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    # Each connection is throttled on its own, like a server with a
+    # per-connection bandwidth cap.
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        start, end = 0, FILE_SIZE - 1
+        ranged = self.headers.get("Range", "").startswith("bytes=")
+        if ranged and self.headers.get("If-Range", ETAG) == ETAG:
+            first, _, last = self.headers["Range"][6:].partition("-")
+            start, end = int(first), int(last) if last else FILE_SIZE - 1
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{FILE_SIZE}")
+        else:
+            self.send_response(200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+        chunk = 256 * 1024
+        try:
+            for pos in range(start, end + 1, chunk):
+                self.wfile.write(PAYLOAD[pos:min(pos + chunk, end + 1)])
+                time.sleep(chunk / BYTES_PER_SECOND)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def timed_fetch(url: str, target: Path, segments: int) -> float:
+    session = make_http_session(segments)
+    start = time.perf_counter()
+    fetch_to_file(session, url, target, segments=segments)
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottledHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/pack.pk3"
+    failures = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        single = Path(tmp) / "single.pk3"
+        segmented = Path(tmp) / "segmented.pk3"
+        single_time = timed_fetch(url, single, 1)
+        segmented_time = timed_fetch(url, segmented, SEGMENTS)
+        for path in (single, segmented):
+            if path.read_bytes() != PAYLOAD:
+                print(f"content mismatch: {path.name}")
+                failures += 1
+
+        # Stop a segmented transfer halfway and pick it up with a new session.
+        resumed = Path(tmp) / "resumed.pk3"
+        deadline = time.monotonic() + segmented_time / 2
+        try:
+            fetch_to_file(make_http_session(SEGMENTS), url, resumed,
+                          stop=lambda: time.monotonic() > deadline, segments=SEGMENTS)
+            print("interrupted transfer finished early")
+            failures += 1
+        except DownloadStopped:
+            pass
+        kept, _ = partial_download_progress(resumed, url)
+        resume_time = timed_fetch(url, resumed, SEGMENTS)
+        if resumed.read_bytes() != PAYLOAD:
+            print("content mismatch: resumed.pk3")
+            failures += 1
+
+    mb = 1024 * 1024
+    print(f"file size:      {FILE_SIZE / mb:.0f} MB, {BYTES_PER_SECOND / mb:.0f} MB/s per connection")
+    print(f"single stream:  {single_time:.2f} s")
+    print(f"{SEGMENTS} segments:     {segmented_time:.2f} s")
+    print(f"speedup:        {single_time / segmented_time:.1f}x")
+    print(f"resume kept:    {kept / mb:.1f} MB, finished in {resume_time:.2f} s")
+    print(f"failures:       {failures}")
+    server.shutdown()
+    return 0 if not failures and segmented_time < single_time else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
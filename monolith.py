@@ -1,24 +1,37 @@
 import pil_config
 
+import array
 import base64
+import bisect
+import collections
+import concurrent.futures
 import configparser
+import csv
 import ctypes
+import ctypes.util
 import datetime
+import errno
 import hashlib
 import io
 import json
 import logging
+import mmap
+import multiprocessing
 import os
 import re
+import select
 import shutil
 import socket
+import sqlite3
 import stat
+import struct
 import subprocess
 import sys
+import textwrap
 import threading
 import time
-from threading import Timer
 import zipfile
+import zlib
 import tarfile
 from pathlib import Path
 
@@ -87,6 +100,27 @@ NWH_ASSETS = {"nwh-assets.pk3", "nwh-bins.pk3"}
 
 PROTECTED_ASSETS = JK2_ASSETS | JK2MV_ASSETS | ETJK2_ASSETS | NWH_ASSETS
 
+# Optional keys in config.json and their defaults
+USER_SETTINGS = {
+    "thumbnail_cache_mb": 256,
+    # Overrides for DEFAULT_PREVIEW_RULES, merged key by key
+    "preview_rules": {},
+    # Keep mod files in a shared content-addressed store under CONFIG_DIR and
+    # link them into each profile's base folder ("hardlink" or "symlink").
+    # Linked mods share the stored file with every profile, so a mod that is
+    # edited in place changes everywhere; edit a copy instead.
+    "mod_store": False,
+    "mod_store_link": "hardlink",
+    # How long the cached mod database is used before it is revalidated
+    "mod_database_ttl_minutes": 30,
+    # Overrides for DownloadSearchIndex.FIELD_WEIGHTS
+    "download_search_weights": {},
+    # Number of mods downloaded at the same time
+    "download_concurrency": 3,
+    # Parallel byte-range segments per large download, if the server allows it
+    "download_segments": 4,
+}
+
 # UI Colors
 COLOR_PRIMARY = "#3a86ff"       # Blue
 COLOR_SUCCESS = "#8338ec"       # Purple
@@ -141,6 +175,18 @@ CONFIG_DIR = get_config_dir("monolith")
 CONFIG_DIR.mkdir(parents=True, exist_ok=True)
 CONFIG_FILE = CONFIG_DIR / "config.json"
 RCON_CONFIG_FILE = CONFIG_DIR / "servers.ini"
+CATALOG_FILE = CONFIG_DIR / "catalog.db"
+ARCHIVE_INDEX_FILE = CONFIG_DIR / "archives.db"
+MOD_STORE_DIR = CONFIG_DIR / "store"
+JOURNAL_FILE = CONFIG_DIR / "fileops.journal"
+DOWNLOAD_QUEUE_FILE = CONFIG_DIR / "downloads.json"
+THUMBNAIL_DIR = CONFIG_DIR / "thumbnails"
+MOD_DATABASE_CACHE = CONFIG_DIR / "mods.json"
+PREVIEW_MEMORY_ITEMS = 64
+PREGENERATION_DELAY_MS = 5000
+HASH_BUFFER_SIZE = 1024 * 1024
+ARCHIVE_MMAP_THRESHOLD = 32 * 1024 * 1024
+HASH_WORKERS = min(8, os.cpu_count() or 4)
 
 # Logging
 logfile_path = CONFIG_DIR / "error.log"
@@ -150,9 +196,11 @@ logging.basicConfig(filename=logfile_path, level=logging.INFO, format='%(asctime
 def get_sha256_hash(filepath: Path) -> str:
     hash_obj = hashlib.sha256()
     try:
-        with open(filepath, 'rb') as f:
-            while chunk := f.read(4096):
-                hash_obj.update(chunk)
+        buf = bytearray(HASH_BUFFER_SIZE)
+        view = memoryview(buf)
+        with open(filepath, 'rb', buffering=0) as f:
+            while n := f.readinto(buf):
+                hash_obj.update(view[:n])
         return hash_obj.hexdigest()
     except Exception as e:
         logging.error(f"Failed to get SHA256 hash for {filepath}: {e}")
@@ -165,12 +213,2653 @@ def clean_rcon_response(response: str) -> str:
     lines = cleaned_response.split('\n')
     return '\n'.join(line.strip() for line in lines if line.strip())
 
+# Mod Catalog
+class ModCatalog:
+    # Directories modified this recently are rescanned again on the next pass,
+    # since a write landing in the same mtime tick would otherwise go unseen.
+    MTIME_SETTLE_NS = 2_000_000_000
+
+    def __init__(self, db_path: Path):
+        self.lock = threading.RLock()
+        self.listings: dict[str, dict[str, tuple[int, int, int]]] = {}
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.DatabaseError as e:
+            logging.warning(f"Catalog WAL mode unavailable: {e}")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                dir TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS files_dir ON files(dir);
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                inode INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+            """
+        )
+        self.conn.commit()
+
+    def _listing(self, directory: str) -> dict[str, tuple[int, int, int]]:
+        listing = self.listings.get(directory)
+        if listing is None:
+            rows = self.conn.execute(
+                "SELECT name, size, mtime_ns, inode FROM files WHERE dir = ?", (directory,)
+            ).fetchall()
+            listing = {name: (size, mtime_ns, inode) for name, size, mtime_ns, inode in rows}
+            self.listings[directory] = listing
+        return listing
+
+    def listing(self, directory: Path) -> dict[str, tuple[int, int, int]]:
+        with self.lock:
+            return dict(self._listing(str(directory)))
+
+    def _scan(self, directory: Path) -> dict[str, tuple[int, int, int]]:
+        listing = {}
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.name.lower().endswith(".pk3"):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue
+                listing[entry.name] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return listing
+
+    def lookup(self, path: Path) -> tuple[int, int, int] | None:
+        with self.lock:
+            return self._listing(str(path.parent)).get(path.name)
+
+    def reconcile(self, directories: list[Path]) -> list[tuple]:
+        added, removed, modified = {}, {}, []
+        for directory in directories:
+            key = str(directory)
+            try:
+                dir_mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                dir_mtime = None
+            with self.lock:
+                old = dict(self._listing(key))
+                row = self.conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (key,)).fetchone()
+            if dir_mtime is not None and row and row[0] == dir_mtime:
+                continue
+            try:
+                new = self._scan(directory) if dir_mtime is not None else {}
+            except OSError as e:
+                logging.error(f"Error scanning {directory}: {e}")
+                continue
+            for name, info in new.items():
+                if name not in old:
+                    added[directory / name] = info
+                elif old[name] != info:
+                    modified.append(("modified", directory / name))
+            for name in old.keys() - new.keys():
+                removed[directory / name] = old[name]
+            settled = dir_mtime is not None and time.time_ns() - dir_mtime > self.MTIME_SETTLE_NS
+            with self.lock:
+                self.listings[key] = new
+                self.conn.execute("DELETE FROM files WHERE dir = ?", (key,))
+                self.conn.executemany(
+                    "INSERT INTO files (path, dir, name, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(str(directory / name), key, name, *info) for name, info in new.items()]
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO dirs (path, mtime_ns) VALUES (?, ?)",
+                    (key, dir_mtime if settled else 0)
+                )
+                self.conn.commit()
+
+        # A path that vanished while another with the same inode and size
+        # appeared is a rename, reported as such so rows can be moved.
+        changes = []
+        by_identity = {(info[2], info[0]): path for path, info in added.items()}
+        for path, info in removed.items():
+            dst = by_identity.pop((info[2], info[0]), None) if info[2] else None
+            if dst is not None:
+                del added[dst]
+                changes.append(("moved", path, dst))
+            else:
+                changes.append(("removed", path))
+        changes.extend(("added", path) for path in added)
+        changes.extend(modified)
+        return changes
+
+    def cached_hash(self, path: Path, st: os.stat_result) -> str | None:
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT sha256 FROM hashes WHERE path = ? AND size = ? AND mtime_ns = ? AND inode = ?",
+                (str(path), st.st_size, st.st_mtime_ns, st.st_ino)
+            ).fetchone()
+        return row[0] if row else None
+
+    def store_hashes(self, rows: list[tuple[Path, os.stat_result, str]]):
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO hashes (path, size, mtime_ns, inode, sha256) VALUES (?, ?, ?, ?, ?)",
+                [(str(path), st.st_size, st.st_mtime_ns, st.st_ino, digest) for path, st, digest in rows]
+            )
+            self.conn.commit()
+
+    def record_add(self, path: Path):
+        try:
+            st = path.stat()
+        except OSError:
+            self.record_remove(path)
+            return
+        info = (st.st_size, st.st_mtime_ns, st.st_ino)
+        with self.lock:
+            self._listing(str(path.parent))[path.name] = info
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, dir, name, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?, ?)",
+                (str(path), str(path.parent), path.name, *info)
+            )
+            self.conn.commit()
+
+    def record_remove(self, path: Path):
+        with self.lock:
+            self._listing(str(path.parent)).pop(path.name, None)
+            self.conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+            self.conn.commit()
+
+    def record_move(self, src: Path, dst: Path):
+        self.record_moves([(src, dst)])
+
+    def record_moves(self, moves: list[tuple[Path, Path]]):
+        with self.lock:
+            for src, dst in moves:
+                info = self._listing(str(src.parent)).pop(src.name, None)
+                if info is None:
+                    self.record_add(dst)
+                    continue
+                self._listing(str(dst.parent))[dst.name] = info
+                self.conn.execute("DELETE FROM files WHERE path = ?", (str(src),))
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files (path, dir, name, size, mtime_ns, inode) VALUES (?, ?, ?, ?, ?, ?)",
+                    (str(dst), str(dst.parent), dst.name, *info)
+                )
+            self.conn.commit()
+
+def iter_file_hashes(items, catalog: ModCatalog, window: int = HASH_WORKERS * 4):
+    # Yields (path, extra, stat, sha256) in input order while keeping at most
+    # `window` files in flight, so memory stays flat on very large libraries.
+    fresh = []
+    in_flight = collections.deque()
+
+    def settle():
+        path, extra, st, result = in_flight.popleft()
+        digest = result.result() if isinstance(result, concurrent.futures.Future) else result
+        if isinstance(result, concurrent.futures.Future) and digest != "ERROR":
+            fresh.append((path, st, digest))
+            if len(fresh) >= 256:
+                catalog.store_hashes(fresh)
+                fresh.clear()
+        return path, extra, st, digest
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        for path, extra in items:
+            try:
+                st = path.stat()
+            except OSError as e:
+                logging.error(f"Failed to stat {path}: {e}")
+                in_flight.append((path, extra, None, "ERROR"))
+            else:
+                digest = catalog.cached_hash(path, st)
+                in_flight.append((path, extra, st, digest or pool.submit(get_sha256_hash, path)))
+            while len(in_flight) > window:
+                yield settle()
+        while in_flight:
+            yield settle()
+    if fresh:
+        catalog.store_hashes(fresh)
+
+# Mod Export
+EXPORT_FIELDS = ["name", "status", "load_order", "size_mb", "path", "sha256", "last_modified", "files_won", "files_lost"]
+EXPORT_FORMATS = {".json": "json", ".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv"}
+
+def scan_mod_names(base: Path) -> set[str]:
+    if not base.is_dir():
+        return set()
+    with os.scandir(base) as it:
+        return {
+            entry.name for entry in it
+            if entry.name.lower().endswith(".pk3") and entry.name not in PROTECTED_ASSETS
+        }
+
+def iter_mod_files(mod_folder: Path):
+    for base, status in ((mod_folder, "Enabled"), (mod_folder / DISABLED_DIR_NAME, "Disabled")):
+        if not base.exists():
+            continue
+        with os.scandir(base) as it:
+            names = sorted((entry.name for entry in it if entry.name.lower().endswith(".pk3")), key=str.lower)
+        for name in names:
+            if name in PROTECTED_ASSETS:
+                continue
+            yield base / name, status
+
+def iter_export_records(mod_folder: Path, catalog: ModCatalog, conflicts: "ConflictIndex | None" = None):
+    load_order = 0
+    for fpath, status, file_stats, file_hash in iter_file_hashes(iter_mod_files(mod_folder), catalog):
+        if file_stats is None:
+            continue
+        load_order += 1
+        formatted_time = datetime.datetime.fromtimestamp(file_stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        record = {
+            "name": fpath.name,
+            "status": status,
+            "load_order": load_order,
+            "size_mb": file_stats.st_size / (1024 * 1024),
+            "path": str(fpath),
+            "sha256": file_hash,
+            "last_modified": formatted_time
+        }
+        if conflicts is not None:
+            wins, losses = conflicts.report(fpath.name) if status == "Enabled" else ([], [])
+            record["files_won"] = len(wins)
+            record["files_lost"] = len(losses)
+            record["won_files"] = dict(wins)
+            record["lost_files"] = dict(losses)
+        yield record
+
+def write_export(records, f, fmt: str, progress=None) -> int:
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+    elif fmt == "json":
+        f.write("[")
+    for record in records:
+        if fmt == "csv":
+            writer.writerow(record)
+        elif fmt == "ndjson":
+            f.write(json.dumps(record) + "\n")
+        else:
+            f.write(",\n" if count else "\n")
+            f.write(textwrap.indent(json.dumps(record, indent=4), "    "))
+        count += 1
+        if count % 64 == 0:
+            f.flush()
+        if progress:
+            progress(count)
+    if fmt == "json":
+        f.write("\n]" if count else "]")
+    return count
+
+# Duplicate Finder
+PARTIAL_HASH_BYTES = 64 * 1024
+FICLONE = 0x40049409
+
+def get_partial_hash(filepath: Path, size: int) -> str:
+    # Head and tail of the file; for a PK3 the tail is the central directory,
+    # which differs between almost any two archives of the same size.
+    hash_obj = hashlib.sha256()
+    try:
+        with open(filepath, "rb", buffering=0) as f:
+            hash_obj.update(f.read(PARTIAL_HASH_BYTES))
+            if size > PARTIAL_HASH_BYTES:
+                f.seek(max(PARTIAL_HASH_BYTES, size - PARTIAL_HASH_BYTES))
+                hash_obj.update(f.read(PARTIAL_HASH_BYTES))
+        return hash_obj.hexdigest()
+    except Exception as e:
+        logging.error(f"Failed to get partial hash for {filepath}: {e}")
+        return "ERROR"
+
+def iter_dedupe_candidates(folders: list[Path]):
+    seen = set()
+    for folder in folders:
+        for mod_path, _ in iter_mod_files(folder):
+            key = os.path.normcase(os.path.abspath(mod_path))
+            if key not in seen:
+                seen.add(key)
+                yield mod_path
+
+def find_duplicate_groups(paths, catalog: ModCatalog, progress=None) -> list[tuple[str, int, list[Path]]]:
+    by_size: dict[int, list[tuple[Path, tuple[int, int]]]] = collections.defaultdict(list)
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError as e:
+            logging.error(f"Failed to stat {path}: {e}")
+            continue
+        by_size[st.st_size].append((path, (st.st_dev, st.st_ino)))
+
+    # Files that already share an inode count once; a size bucket needs two
+    # distinct files before any of it is read.
+    buckets = [(size, items) for size, items in by_size.items() if len({ident for _, ident in items}) > 1]
+    partial_groups: dict[tuple[int, str], list[Path]] = collections.defaultdict(list)
+    total = sum(len(items) for _, items in buckets)
+    done = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+        futures = {
+            pool.submit(get_partial_hash, path, size): (size, path)
+            for size, items in buckets for path, _ in items
+        }
+        for future in concurrent.futures.as_completed(futures):
+            size, path = futures[future]
+            digest = future.result()
+            if digest != "ERROR":
+                partial_groups[(size, digest)].append(path)
+            done += 1
+            if progress:
+                progress("Scanning", done, total)
+
+    candidates = [path for group in partial_groups.values() if len(group) > 1 for path in group]
+    full: dict[tuple[int, str], list[Path]] = collections.defaultdict(list)
+    sizes = {path: size for (size, _), group in partial_groups.items() for path in group}
+    count = 0
+    for path, _, _, digest in iter_file_hashes(((path, None) for path in candidates), catalog):
+        if digest != "ERROR":
+            full[(sizes[path], digest)].append(path)
+        count += 1
+        if progress:
+            progress("Hashing", count, len(candidates))
+
+    groups = [(digest, size, sorted(group, key=str)) for (size, digest), group in full.items() if len(group) > 1]
+    groups.sort(key=lambda group: group[1] * (len(group[2]) - 1), reverse=True)
+    return groups
+
+def clone_file(source: Path, target: Path):
+    if sys.platform.startswith("linux"):
+        import fcntl
+        with open(source, "rb") as src, open(target, "xb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except OSError:
+                dst.close()
+                target.unlink(missing_ok=True)
+                raise
+    elif sys.platform == "darwin":
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if libc.clonefile(os.fsencode(source), os.fsencode(target), 0) != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(target))
+    else:
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are not supported on this platform", str(target))
+
+def replace_with_link(source: Path, target: Path, mode: str):
+    st = target.stat() if target.exists() else None
+    tmp = target.with_name(f".{target.name}.dedupe")
+    tmp.unlink(missing_ok=True)
+    try:
+        if mode == "hardlink":
+            os.link(source, tmp)
+        elif mode == "symlink":
+            os.symlink(source.resolve(), tmp)
+        else:
+            clone_file(source, tmp)
+            if st:
+                os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, target)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+
+def link_duplicate_groups(groups: list[tuple[str, int, list[Path]]], mode: str, catalog: ModCatalog, progress=None):
+    linked, reclaimed, errors = 0, 0, []
+    for index, (digest, size, paths) in enumerate(groups, start=1):
+        keep = paths[0]
+        try:
+            keep_st = keep.stat()
+        except OSError as e:
+            errors.append(f"{keep.name}: {e}")
+            continue
+        for path in paths[1:]:
+            try:
+                st = path.stat()
+                if (st.st_dev, st.st_ino) == (keep_st.st_dev, keep_st.st_ino):
+                    continue
+                # Only replace files whose content is still the hashed content.
+                if catalog.cached_hash(path, st) != digest or catalog.cached_hash(keep, keep_st) != digest:
+                    errors.append(f"{path.name}: changed since it was scanned")
+                    continue
+                replace_with_link(keep, path, mode)
+                catalog.store_hashes([(path, path.stat(), digest)])
+                linked += 1
+                reclaimed += size
+            except Exception as e:
+                logging.error(f"Failed to {mode} {path} to {keep}: {e}")
+                errors.append(f"{path.name}: {e}")
+        if progress:
+            progress(index, len(groups))
+    return linked, reclaimed, errors
+
+# Mod Store
+class ModStore:
+    # Every path linked to a blob is recorded under refs/, so a blob stays
+    # alive while a symlink anywhere still points at it, not just in the
+    # folders of the current profiles.
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.lock = threading.Lock()
+
+    def blob_path(self, digest: str) -> Path:
+        return self.directory / digest[:2] / digest
+
+    def refs_path(self, digest: str) -> Path:
+        return self.directory / "refs" / digest[:2] / digest
+
+    def _read_referrers(self, digest: str) -> list[str]:
+        try:
+            return self.refs_path(digest).read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            return []
+
+    def _add_referrer(self, digest: str, path: Path):
+        referrer = str(path.absolute())
+        with self.lock:
+            if referrer in self._read_referrers(digest):
+                return
+            refs = self.refs_path(digest)
+            refs.parent.mkdir(parents=True, exist_ok=True)
+            with open(refs, "a", encoding="utf-8") as f:
+                f.write(referrer + "\n")
+
+    def _live_referrers(self, digest: str) -> list[str]:
+        blob = self.blob_path(digest).resolve()
+        live = []
+        for referrer in self._read_referrers(digest):
+            path = Path(referrer)
+            try:
+                if path.is_symlink() and path.resolve() == blob:
+                    live.append(referrer)
+            except OSError:
+                continue
+        return live
+
+    def contains(self, digest: str) -> bool:
+        return self.blob_path(digest).is_file()
+
+    def is_linked(self, path: Path, digest: str) -> bool:
+        blob = self.blob_path(digest)
+        try:
+            if path.is_symlink():
+                return path.resolve() == blob.resolve()
+            st, blob_st = path.stat(), blob.stat()
+        except OSError:
+            return False
+        return (st.st_dev, st.st_ino) == (blob_st.st_dev, blob_st.st_ino)
+
+    def _link(self, blob: Path, target: Path, mode: str):
+        try:
+            replace_with_link(blob, target, mode)
+        except OSError as e:
+            # Hardlinks cannot cross filesystems; a symlink still avoids the copy.
+            if mode != "hardlink" or e.errno != errno.EXDEV:
+                raise
+            replace_with_link(blob, target, "symlink")
+        self._add_referrer(blob.name, target)
+
+    def ingest(self, path: Path, digest: str, mode: str):
+        blob = self.blob_path(digest)
+        if not blob.is_file():
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f"{digest}.tmp")
+            tmp.unlink(missing_ok=True)
+            try:
+                os.link(path.resolve(), tmp)
+            except OSError:
+                shutil.copy2(path, tmp)
+            os.replace(tmp, blob)
+        if not self.is_linked(path, digest):
+            self._link(blob, path, mode)
+        else:
+            self._add_referrer(digest, path)
+
+    def materialize(self, digest: str, target: Path, mode: str):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        self._link(self.blob_path(digest), target, mode)
+
+    def collect_garbage(self, folders: list[Path]) -> tuple[int, int]:
+        # A blob is still in use while a hardlink shares it, a symlink in any
+        # profile folder points at it, or a recorded referrer still does.
+        referenced = set()
+        for folder in folders:
+            for base in (folder, folder / DISABLED_DIR_NAME):
+                if not base.is_dir():
+                    continue
+                with os.scandir(base) as it:
+                    for entry in it:
+                        if entry.is_symlink():
+                            referenced.add(Path(os.readlink(entry.path)).name)
+        removed, freed = 0, 0
+        if not self.directory.is_dir():
+            return removed, freed
+        with os.scandir(self.directory) as it:
+            buckets = [bucket.path for bucket in it if bucket.is_dir() and bucket.name != "refs"]
+        for bucket in buckets:
+            with os.scandir(bucket) as it:
+                entries = list(it)
+            for entry in entries:
+                if entry.name.endswith(".tmp"):
+                    continue
+                st = entry.stat()
+                if entry.name in referenced or st.st_nlink > 1:
+                    continue
+                with self.lock:
+                    live = self._live_referrers(entry.name)
+                    refs = self.refs_path(entry.name)
+                    try:
+                        if live:
+                            refs.write_text("".join(f"{referrer}\n" for referrer in live), encoding="utf-8")
+                            continue
+                        os.unlink(entry.path)
+                        refs.unlink(missing_ok=True)
+                        removed += 1
+                        freed += st.st_size
+                    except OSError as e:
+                        logging.warning(f"Failed to remove store blob {entry.name}: {e}")
+        return removed, freed
+
+# File Operations
+def fsync_dir(path: Path):
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+COPY_BUFFER_SIZE = 8 * 1024 * 1024
+COPY_WORKERS = 4
+COPY_FALLBACK_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+def _copy_data(source: Path, target: Path, size: int, progress=None):
+    with open(source, "rb", buffering=0) as src, open(target, "wb", buffering=0) as dst:
+        if hasattr(os, "copy_file_range"):
+            # In-kernel copy; server-side or reflinked on filesystems that
+            # support it.
+            copied = 0
+            try:
+                while n := os.copy_file_range(src.fileno(), dst.fileno(), COPY_BUFFER_SIZE * 8):
+                    copied += n
+                    if progress:
+                        progress(n)
+                return
+            except OSError as e:
+                if e.errno not in COPY_FALLBACK_ERRORS:
+                    raise
+                if progress and copied:
+                    progress(-copied)
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+        buf = bytearray(min(COPY_BUFFER_SIZE, max(size, 1)))
+        view = memoryview(buf)
+        while n := src.readinto(buf):
+            written = 0
+            while written < n:
+                written += dst.write(view[written:n])
+            if progress:
+                progress(n)
+
+def copy_file(source: Path, target: Path, progress=None):
+    # Reflink first, then copy_file_range, then large buffered reads.
+    size = source.stat().st_size
+    try:
+        clone_file(source, target)
+        if progress:
+            progress(size)
+    except OSError:
+        target.unlink(missing_ok=True)
+        _copy_data(source, target, size, progress)
+    shutil.copystat(source, target)
+
+class TransferProgress:
+    def __init__(self, total: int, report, interval: float = 0.25):
+        self.total = total
+        self.done = 0
+        self.report = report
+        self.interval = interval
+        self.start = time.monotonic()
+        self.last = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, count: int):
+        with self.lock:
+            self.done += count
+            now = time.monotonic()
+            if now - self.last < self.interval and self.done < self.total:
+                return
+            self.last = now
+            done, rate = self.done, self.done / max(now - self.start, 1e-6)
+        self.report(done, self.total, rate)
+
+class FileOpJournal:
+    # Operations are ("move", src, dst), ("copy", src, dst) and ("delete",
+    # path). A batch is written to the journal and synced before anything is
+    # touched, and the journal is emptied once the batch is durable. Moves and
+    # deletes run first in the caller's order, then all copies in parallel;
+    # callers never put dependent operations of different kinds in one batch.
+    # Copies record whether their target existed and are marked done once
+    # committed, so an interrupted batch can be finished or undone on the
+    # next start without guessing from file contents.
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def side_path(path: Path, batch: str, suffix: str) -> Path:
+        return path.with_name(f".{path.name}.{batch}.{suffix}")
+
+    def pending(self) -> dict | None:
+        try:
+            lines = self.path.read_text(encoding="utf-8").split("\n")
+        except FileNotFoundError:
+            return None
+        try:
+            record = json.loads(lines[0]) if lines[0].strip() else None
+        except ValueError:
+            # A torn begin record means nothing was applied yet.
+            return None
+        if record is None:
+            return None
+        record["done"] = set()
+        for line in lines[1:]:
+            try:
+                record["done"].update(json.loads(line)["done"])
+            except (ValueError, KeyError, TypeError):
+                # Only the last line can be torn; its ops are redone.
+                break
+        return record
+
+    def _begin(self, batch: str, ops: list[tuple]):
+        record = {
+            "batch": batch,
+            "ops": [[op[0], *map(str, op[1:])] for op in ops],
+            "existed": [op[0] == "copy" and op[2].exists() for op in ops],
+        }
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _mark_done(self, indexes: list[int]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"done": indexes}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _end(self):
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+
+    @staticmethod
+    def _sync(parts: list[Path], dirs: set[Path]):
+        # One barrier per batch instead of one fsync per copied file.
+        if parts:
+            if hasattr(os, "sync"):
+                os.sync()
+            else:
+                for part in parts:
+                    with open(part, "rb+") as f:
+                        os.fsync(f.fileno())
+        for folder in dirs:
+            try:
+                fsync_dir(folder)
+            except OSError as e:
+                logging.warning(f"Failed to sync {folder}: {e}")
+
+    def run(self, ops: list[tuple], progress=None, on_bytes=None) -> list[tuple[tuple, Exception | None]]:
+        with self.lock:
+            for folder in {op[2].parent for op in ops if op[0] in ("move", "copy")}:
+                try:
+                    folder.mkdir(parents=True, exist_ok=True)
+                except OSError as e:
+                    logging.error(f"Failed to create {folder}: {e}")
+            batch = f"{time.time_ns():x}"
+            self._begin(batch, ops)
+            results: list[list] = [[op, None] for op in ops]
+            parts, trash, dirs = [], [], set()
+            copies = []
+            done = 0
+
+            def finished():
+                nonlocal done
+                done += 1
+                if progress:
+                    progress(done, len(ops))
+
+            for index, op in enumerate(ops):
+                kind, path = op[0], op[-1]
+                if kind == "copy":
+                    copies.append(index)
+                    continue
+                try:
+                    if kind == "move":
+                        # A case-only rename on a case-insensitive filesystem
+                        # finds the source itself at the destination.
+                        same = str(op[1]).lower() == str(path).lower() and path.exists() and os.path.samefile(op[1], path)
+                        if path.exists() and not same:
+                            raise FileExistsError(f"{path.name} already exists in {path.parent.name}")
+                        try:
+                            op[1].rename(path)
+                        except PermissionError:
+                            op[1].chmod(op[1].stat().st_mode | stat.S_IWUSR)
+                            op[1].rename(path)
+                        dirs.update((op[1].parent, path.parent))
+                    else:
+                        deleted = self.side_path(path, batch, "deleted")
+                        path.rename(deleted)
+                        trash.append(deleted)
+                        dirs.add(path.parent)
+                except Exception as e:
+                    logging.error(f"File operation {kind} failed for {path}: {e}")
+                    results[index][1] = e
+                finished()
+            if copies:
+                with concurrent.futures.ThreadPoolExecutor(max_workers=min(COPY_WORKERS, len(copies))) as pool:
+                    futures = {
+                        pool.submit(copy_file, ops[index][1], self.side_path(ops[index][2], batch, "part"), on_bytes): index
+                        for index in copies
+                    }
+                    for future in concurrent.futures.as_completed(futures):
+                        index = futures[future]
+                        part = self.side_path(ops[index][2], batch, "part")
+                        try:
+                            future.result()
+                            parts.append(part)
+                        except Exception as e:
+                            logging.error(f"File operation copy failed for {ops[index][2]}: {e}")
+                            part.unlink(missing_ok=True)
+                            results[index][1] = e
+                        finished()
+            self._sync(parts, set())
+            for result in results:
+                op, error = result
+                if op[0] != "copy" or error:
+                    continue
+                target = op[2]
+                part = self.side_path(target, batch, "part")
+                try:
+                    if target.exists():
+                        old = self.side_path(target, batch, "deleted")
+                        target.rename(old)
+                        trash.append(old)
+                    os.replace(part, target)
+                    dirs.add(target.parent)
+                except Exception as e:
+                    logging.error(f"File operation copy failed for {target}: {e}")
+                    part.unlink(missing_ok=True)
+                    result[1] = e
+            self._sync([], dirs)
+            # Old copies are only dropped once the batch is marked done, so
+            # a rollback up to this point can still restore them.
+            self._mark_done([i for i, (op, error) in enumerate(results) if not error])
+            for deleted in trash:
+                try:
+                    deleted.unlink()
+                except OSError as e:
+                    logging.warning(f"Failed to remove {deleted}: {e}")
+            self._end()
+            return [tuple(result) for result in results]
+
+    def recover(self, roll_back: bool = False) -> int:
+        record = self.pending()
+        if record is None:
+            return 0
+        batch = record["batch"]
+        done = record["done"]
+        existed = record.get("existed") or [True] * len(record["ops"])
+        repaired = 0
+        dirs = set()
+        with self.lock:
+            for index, (kind, *paths) in enumerate(record["ops"]):
+                paths = [Path(path) for path in paths]
+                target = paths[-1]
+                dirs.add(target.parent)
+                try:
+                    if kind == "move":
+                        src, dst = paths
+                        if roll_back:
+                            src, dst = dst, src
+                        if src.exists() and not dst.exists():
+                            src.rename(dst)
+                            repaired += 1
+                    elif kind == "copy":
+                        part = self.side_path(target, batch, "part")
+                        old = self.side_path(target, batch, "deleted")
+                        part.unlink(missing_ok=True)
+                        if roll_back:
+                            if old.exists():
+                                os.replace(old, target)
+                                repaired += 1
+                            elif not existed[index] and target.exists():
+                                target.unlink()
+                                repaired += 1
+                            elif index in done:
+                                logging.warning(f"Cannot undo overwrite of {target}, the old copy is gone")
+                            continue
+                        if index in done:
+                            old.unlink(missing_ok=True)
+                            continue
+                        if not paths[0].exists():
+                            if old.exists() and not target.exists():
+                                os.replace(old, target)
+                            continue
+                        # The copy may not have happened or may be torn, so it
+                        # is always redone from the source.
+                        copy_file(paths[0], part)
+                        with open(part, "rb+") as f:
+                            os.fsync(f.fileno())
+                        if target.exists() and not old.exists():
+                            target.rename(old)
+                        os.replace(part, target)
+                        old.unlink(missing_ok=True)
+                        repaired += 1
+                    else:
+                        deleted = self.side_path(target, batch, "deleted")
+                        if roll_back:
+                            if deleted.exists() and not target.exists():
+                                deleted.rename(target)
+                                repaired += 1
+                        elif target.exists() or deleted.exists():
+                            target.unlink(missing_ok=True)
+                            deleted.unlink(missing_ok=True)
+                            repaired += 1
+                except Exception as e:
+                    logging.error(f"Failed to recover {kind} of {target}: {e}")
+            self._sync([], {folder for folder in dirs if folder.is_dir()})
+            self._end()
+        return repaired
+
+# Archive Index
+ZIP_LOCAL_HEADER = struct.Struct("<4s5H3L2H")
+
+def open_archive_view(f, size: int):
+    if size >= ARCHIVE_MMAP_THRESHOLD:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return None
+
+def read_central_directory(path: Path) -> list[tuple[str, int, int, int, int, int]]:
+    with open(path, "rb") as f:
+        view = open_archive_view(f, os.fstat(f.fileno()).st_size)
+        try:
+            with zipfile.ZipFile(view if view is not None else f) as z:
+                return [
+                    (info.filename, info.header_offset, info.compress_size, info.file_size, info.CRC, info.compress_type)
+                    for info in z.infolist() if not info.is_dir()
+                ]
+        finally:
+            if view is not None:
+                view.close()
+
+def read_archive_entry(path: Path, entry: tuple) -> bytes:
+    name, offset, compress_size, file_size, crc, method = entry
+    if method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+        with zipfile.ZipFile(path) as z:
+            return z.read(name)
+    with open(path, "rb") as f:
+        view = open_archive_view(f, os.fstat(f.fileno()).st_size)
+        try:
+            source = view if view is not None else f
+            source.seek(offset)
+            header = ZIP_LOCAL_HEADER.unpack(source.read(ZIP_LOCAL_HEADER.size))
+            if header[0] != b"PK\x03\x04":
+                raise zipfile.BadZipFile(f"Bad local header for {name} in {path.name}")
+            source.seek(offset + ZIP_LOCAL_HEADER.size + header[9] + header[10])
+            data = source.read(compress_size)
+        finally:
+            if view is not None:
+                view.close()
+    if method == zipfile.ZIP_DEFLATED:
+        data = zlib.decompress(data, -15)
+    if zlib.crc32(data) != crc:
+        raise zipfile.BadZipFile(f"CRC mismatch for {name} in {path.name}")
+    return data
+
+class ArchiveIndex:
+    MEMORY_ENTRIES = 32
+
+    def __init__(self, db_path: Path):
+        self.lock = threading.RLock()
+        self.memory: collections.OrderedDict[str, tuple[int, int, list]] = collections.OrderedDict()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS archives (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                names BLOB NOT NULL,
+                fields BLOB NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    # Names are stored as one NUL-separated blob and the numeric fields as a
+    # flat int64 array, which decodes far faster than a JSON list of lists.
+    @staticmethod
+    def _encode(entries: list[tuple]) -> tuple[bytes, bytes]:
+        names = "\0".join(entry[0] for entry in entries).encode("utf-8")
+        fields = array.array("q", (value for entry in entries for value in entry[1:]))
+        return zlib.compress(names), zlib.compress(fields.tobytes())
+
+    @staticmethod
+    def _decode(names_blob: bytes, fields_blob: bytes) -> list[tuple]:
+        names = zlib.decompress(names_blob).decode("utf-8").split("\0") if names_blob else []
+        fields = array.array("q")
+        fields.frombytes(zlib.decompress(fields_blob))
+        columns = [fields[i::5] for i in range(5)]
+        return list(zip(names, *columns))
+
+    def _remember(self, key: str, size: int, mtime_ns: int, entries: list):
+        self.memory[key] = (size, mtime_ns, entries)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.MEMORY_ENTRIES:
+            self.memory.popitem(last=False)
+
+    def entries(self, path: Path) -> list[tuple[str, int, int, int, int, int]]:
+        st = path.stat()
+        key = str(path)
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached and cached[:2] == (st.st_size, st.st_mtime_ns):
+                self.memory.move_to_end(key)
+                return cached[2]
+            row = self.conn.execute(
+                "SELECT names, fields FROM archives WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (key, st.st_size, st.st_mtime_ns)
+            ).fetchone()
+        if row:
+            entries = self._decode(*row)
+        else:
+            entries = read_central_directory(path)
+            with self.lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO archives (path, size, mtime_ns, names, fields) VALUES (?, ?, ?, ?, ?)",
+                    (key, st.st_size, st.st_mtime_ns, *self._encode(entries))
+                )
+                self.conn.commit()
+        with self.lock:
+            self._remember(key, st.st_size, st.st_mtime_ns, entries)
+        return entries
+
+    def names(self, path: Path) -> list[str]:
+        st = path.stat()
+        key = str(path)
+        with self.lock:
+            cached = self.memory.get(key)
+            if cached and cached[:2] == (st.st_size, st.st_mtime_ns):
+                return [entry[0] for entry in cached[2]]
+            row = self.conn.execute(
+                "SELECT names FROM archives WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (key, st.st_size, st.st_mtime_ns)
+            ).fetchone()
+        if row:
+            return zlib.decompress(row[0]).decode("utf-8").split("\0") if row[0] else []
+        return [entry[0] for entry in self.entries(path)]
+
+    def record_move(self, src: Path, dst: Path):
+        self.record_moves([(src, dst)])
+
+    def record_moves(self, moves: list[tuple[Path, Path]]):
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE OR REPLACE archives SET path = ? WHERE path = ?", [(str(dst), str(src)) for src, dst in moves]
+            )
+            self.conn.commit()
+            for src, dst in moves:
+                cached = self.memory.pop(str(src), None)
+                if cached:
+                    self._remember(str(dst), *cached)
+
+    def find(self, path: Path, name: str) -> tuple | None:
+        return next((entry for entry in self.entries(path) if entry[0] == name), None)
+
+    def read(self, path: Path, name: str) -> bytes:
+        entry = self.find(path, name)
+        if entry is None:
+            raise KeyError(f"{name} not found in {path.name}")
+        return read_archive_entry(path, entry)
+
+# Conflict Index
+class ConflictIndex:
+    BATCH_SIZE = 256
+
+    def __init__(self, archive_index: ArchiveIndex):
+        self.archive_index = archive_index
+        self.lock = threading.Lock()
+        # Inner path -> owning archives in load order; the game reads the
+        # last one. Only enabled archives are tracked.
+        self.owners: dict[str, list[tuple[str, str]]] = {}
+        self.members: dict[str, tuple[tuple[int, int], tuple[str, ...]]] = {}
+
+    @staticmethod
+    def order_key(name: str) -> tuple[str, str]:
+        return (name.lower(), name)
+
+    def _load(self, path: Path) -> tuple[tuple[int, int], tuple[str, ...]]:
+        st = path.stat()
+        names = self.archive_index.names(path)
+        return (st.st_size, st.st_mtime_ns), tuple(dict.fromkeys(name.replace("\\", "/").lower() for name in names))
+
+    def _add(self, name: str, member: tuple):
+        key = self.order_key(name)
+        for inner in member[1]:
+            owners = self.owners.get(inner)
+            if owners is None:
+                self.owners[inner] = [key]
+            else:
+                bisect.insort(owners, key)
+        self.members[name] = member
+
+    def _remove(self, name: str):
+        member = self.members.pop(name, None)
+        if member is None:
+            return
+        key = self.order_key(name)
+        for inner in member[1]:
+            owners = self.owners[inner]
+            if len(owners) == 1:
+                del self.owners[inner]
+            else:
+                del owners[bisect.bisect_left(owners, key)]
+
+    def _apply(self, removed: list[str], loaded: list[tuple[str, tuple]]):
+        with self.lock:
+            for name in removed:
+                self._remove(name)
+            for name, member in loaded:
+                self._remove(name)
+                self._add(name, member)
+
+    def update(self, removed: list[str], added: list[Path]):
+        removed = list(removed)
+        loaded = []
+        for path in added:
+            try:
+                loaded.append((path.name, self._load(path)))
+            except Exception as e:
+                logging.warning(f"Could not index {path.name} for conflicts: {e}")
+                removed.append(path.name)
+        self._apply(removed, loaded)
+
+    def sync(self, paths: list[Path]):
+        wanted = {path.name: path for path in paths}
+        with self.lock:
+            signatures = {name: member[0] for name, member in self.members.items()}
+        self._apply([name for name in signatures if name not in wanted], [])
+        loaded = []
+        for name, path in wanted.items():
+            try:
+                st = path.stat()
+                if signatures.get(name) == (st.st_size, st.st_mtime_ns):
+                    continue
+                loaded.append((name, self._load(path)))
+            except Exception as e:
+                logging.warning(f"Could not index {name} for conflicts: {e}")
+                continue
+            if len(loaded) >= self.BATCH_SIZE:
+                self._apply([], loaded)
+                loaded = []
+        self._apply([], loaded)
+
+    def report(self, name: str) -> tuple[list[tuple[str, list[str]]], list[tuple[str, str]]]:
+        wins, losses = [], []
+        key = self.order_key(name)
+        with self.lock:
+            member = self.members.get(name)
+            if member is None:
+                return wins, losses
+            for inner in member[1]:
+                owners = self.owners[inner]
+                if len(owners) < 2:
+                    continue
+                if owners[-1] == key:
+                    wins.append((inner, [owner[1] for owner in owners[:-1]]))
+                else:
+                    losses.append((inner, owners[-1][1]))
+        return wins, losses
+
+# File Search
+GLOB_CHARS = re.compile(r"[*?\[]")
+
+def compile_file_glob(pattern: str) -> tuple[re.Pattern, str]:
+    # Like fnmatch, but each match is confined to one line of a joined blob.
+    # Also returns the longest literal run, which every match must contain.
+    parts, literals, run = [], [], []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        i += 1
+        if char not in "*?[":
+            parts.append(re.escape(char))
+            run.append(char)
+            continue
+        literals.append("".join(run))
+        run = []
+        if char == "*":
+            parts.append("[^\\n]*")
+        elif char == "?":
+            parts.append("[^\\n]")
+        else:
+            j = i
+            if j < n and pattern[j] == "!":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            end = pattern.find("]", j)
+            if end < 0:
+                parts.append("\\[")
+                run.append("[")
+                continue
+            body = pattern[i:end].replace("\\", "\\\\").replace("]", "\\]")
+            i = end + 1
+            if body.startswith("!"):
+                parts.append(f"[^\\n{body[1:]}]")
+            elif body.startswith("^"):
+                parts.append(f"[\\{body}]")
+            else:
+                parts.append(f"[{body}]")
+    literals.append("".join(run))
+    return re.compile(f"^{''.join(parts)}$", re.MULTILINE), max(literals, key=len)
+
+class FileSearchIndex:
+    RESULT_LIMIT = 2000
+
+    def __init__(self, archive_index: ArchiveIndex):
+        self.archive_index = archive_index
+        self.lock = threading.Lock()
+        # Archive path -> (size, mtime_ns) and its inner paths as one
+        # lowercase newline-joined blob, so a query is a handful of C-level
+        # scans per archive instead of a Python loop per file.
+        self.signatures: dict[str, tuple[int, int]] = {}
+        self.blobs: dict[str, str] = {}
+
+    def _load(self, path: Path) -> tuple[tuple[int, int], str]:
+        st = path.stat()
+        names = self.archive_index.names(path)
+        return (st.st_size, st.st_mtime_ns), "\n".join(names).replace("\\", "/").lower()
+
+    def _apply(self, removed: list[str], loaded: list[tuple[str, tuple]]):
+        with self.lock:
+            for key in removed:
+                self.signatures.pop(key, None)
+                self.blobs.pop(key, None)
+            for key, (signature, blob) in loaded:
+                self.signatures[key] = signature
+                self.blobs[key] = blob
+
+    def update(self, removed: list[Path], added: list[Path]):
+        loaded = []
+        for path in added:
+            try:
+                loaded.append((str(path), self._load(path)))
+            except Exception as e:
+                logging.warning(f"Could not index files of {path.name}: {e}")
+        self._apply([str(path) for path in removed], loaded)
+
+    def sync(self, paths: list[Path]):
+        wanted = {str(path): path for path in paths}
+        with self.lock:
+            signatures = dict(self.signatures)
+        self._apply([key for key in signatures if key not in wanted], [])
+        loaded = []
+        for key, path in wanted.items():
+            try:
+                st = path.stat()
+                if signatures.get(key) == (st.st_size, st.st_mtime_ns):
+                    continue
+                loaded.append((key, self._load(path)))
+            except Exception as e:
+                logging.warning(f"Could not index files of {path.name}: {e}")
+                continue
+            if len(loaded) >= ConflictIndex.BATCH_SIZE:
+                self._apply([], loaded)
+                loaded = []
+        self._apply([], loaded)
+
+    def search(self, query: str) -> tuple[list[tuple[str, str]], bool]:
+        query = query.strip().replace("\\", "/").lower()
+        results: list[tuple[str, str]] = []
+        if not query:
+            return results, False
+        if GLOB_CHARS.search(query):
+            pattern, literal = compile_file_glob(query)
+        else:
+            pattern = None
+            literal = query
+        with self.lock:
+            blobs = list(self.blobs.items())
+        for key, blob in blobs:
+            if literal not in blob:
+                continue
+            if pattern is not None:
+                results.extend((key, match) for match in pattern.findall(blob))
+            else:
+                pos = blob.find(literal)
+                while pos >= 0:
+                    start = blob.rfind("\n", 0, pos) + 1
+                    end = blob.find("\n", pos)
+                    if end < 0:
+                        end = len(blob)
+                    results.append((key, blob[start:end]))
+                    pos = blob.find(literal, end)
+            if len(results) >= self.RESULT_LIMIT:
+                return results[:self.RESULT_LIMIT], True
+        return results, False
+
+# Mod Previews
+DEFAULT_PREVIEW_RULES = {
+    "base_score": 1,
+    "min_score": -20000,
+    "extensions": {".jpg": 10, ".jpeg": 10, ".png": 0, ".tga": 0},
+    "ignore": ["__macosx", "thumbs.db"],
+    # The highest weight among matching folders is applied.
+    "folders": {
+        "levelshots/": 10000,
+        "models/players/": 400,
+        "models/weapons2/": 300,
+        "models/map_objects/mp/": 200,
+        "gfx/menus/": 100,
+        "gfx/ui/": 50
+    },
+    # Exact file names (without extension) win over prefixes.
+    "names": {"preview": 1600, "icon_default": 1500, "levelshot": 1000},
+    "prefixes": {"map_": 400},
+    # Each group applies its score once if any keyword matches the full
+    # path ("path") or the file name without extension ("name").
+    "keyword_groups": [
+        {"match": "path", "score": -800, "keywords": ["icon_blue", "icon_red", "icon_green", "/team/", "_blue", "_red"]},
+        {"match": "name", "score": -15000, "keywords": [
+            "eye", "mouth", "face", "hand", "torso", "arm", "leg",
+            "hips", "cap", "_glow", "_spec", "_norm", "_reflect"
+        ]}
+    ]
+}
+
+class PreviewScorer:
+    def __init__(self, rules: dict | None = None):
+        self.rules = {**DEFAULT_PREVIEW_RULES, **(rules or {})}
+        rules = self.rules
+        self.base_score = int(rules["base_score"])
+        self.min_score = int(rules["min_score"])
+        self.extensions = {f".{ext.lower().lstrip('.')}": int(weight) for ext, weight in rules["extensions"].items()}
+        self.ext_suffixes = tuple(self.extensions)
+        self.ignore_re = re.compile("|".join(re.escape(word.lower()) for word in rules["ignore"])) if rules["ignore"] else None
+        # Heaviest first, so the first folder found is the best one.
+        self.folders = tuple(sorted(
+            ((folder.lower(), int(weight)) for folder, weight in rules["folders"].items()),
+            key=lambda item: -item[1]
+        ))
+        self.names = {name.lower(): int(weight) for name, weight in rules["names"].items()}
+        self.prefixes = tuple(sorted(
+            ((prefix.lower(), int(weight)) for prefix, weight in rules["prefixes"].items()),
+            key=lambda item: -item[1]
+        ))
+        self.prefix_starts = tuple(prefix for prefix, _ in self.prefixes)
+        self.name_bonus = max([0, *self.names.values(), *(weight for _, weight in self.prefixes)])
+        self.keyword_groups = tuple(
+            (
+                group.get("match", "path") == "name",
+                re.compile("|".join(re.escape(word.lower()) for word in group["keywords"])),
+                int(group["score"])
+            )
+            for group in rules["keyword_groups"] if group.get("keywords")
+        )
+        self.keyword_bonus = sum(max(0, score) for _, _, score in self.keyword_groups)
+
+    def score(self, path_lower: str, floor: int | None = None) -> int | None:
+        if not path_lower.endswith(self.ext_suffixes) or (self.ignore_re and self.ignore_re.search(path_lower)):
+            return None
+        base_name = path_lower.rpartition("/")[2]
+        score = self.base_score + self.extensions[base_name[base_name.rfind("."):]]
+        for folder, weight in self.folders:
+            if folder in path_lower:
+                score += weight
+                break
+        # Most entries are ruled out here, before the name and keyword rules,
+        # once a strong candidate has been seen.
+        if floor is not None and score + self.name_bonus + self.keyword_bonus <= floor:
+            return None
+        stem = base_name.rpartition(".")[0]
+        if not stem.strip("."):
+            return None
+        weight = self.names.get(stem)
+        if weight is not None:
+            score += weight
+        elif self.prefix_starts and stem.startswith(self.prefix_starts):
+            score += next(weight for prefix, weight in self.prefixes if stem.startswith(prefix))
+        if floor is not None and score + self.keyword_bonus <= floor:
+            return None
+        for on_name, pattern, group_score in self.keyword_groups:
+            if pattern.search(stem if on_name else path_lower):
+                score += group_score
+        return score
+
+    def best(self, names: list[str]) -> str | None:
+        lowered = "\n".join(names).lower().split("\n")
+        if len(lowered) != len(names):
+            lowered = [name.lower() for name in names]
+        ext_suffixes = self.ext_suffixes
+        best_match = None
+        max_score = self.min_score
+        for index in [i for i, path_lower in enumerate(lowered) if path_lower.endswith(ext_suffixes)]:
+            score = self.score(lowered[index], max_score)
+            if score is not None and score > max_score:
+                max_score = score
+                best_match = names[index]
+        return best_match
+
+PREVIEW_SCORER = PreviewScorer()
+
+def find_preview_entry(names: list[str], scorer: PreviewScorer | None = None) -> str | None:
+    return (scorer or PREVIEW_SCORER).best(names)
+
+def decode_preview_image(data: bytes, width: int) -> Image.Image:
+    img = Image.open(io.BytesIO(data))
+    # Decode close to the target size instead of at full resolution: JPEG
+    # can scale during decoding, other formats get a cheap integer reduce.
+    if img.format == "JPEG":
+        img.draft("RGB", (width, max(1, img.size[1] * width // img.size[0])))
+
+    if img.mode in ("RGBA", "P", "LA"):
+        img = img.convert("RGBA")
+    elif img.mode != "RGB":
+        img = img.convert("RGB")
+
+    factor = img.size[0] // width
+    if factor >= 2:
+        img = img.reduce(factor)
+
+    ratio = width / float(img.size[0])
+    height = int(float(img.size[1]) * ratio)
+    return img.resize((width, height), Image.Resampling.LANCZOS)
+
+def lower_process_priority():
+    # Pre-generation must never compete with the game or the UI for disk
+    # or CPU, so the worker processes drop to idle CPU and I/O priority.
+    try:
+        if os.name == "nt":
+            PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), PROCESS_MODE_BACKGROUND_BEGIN)
+            return
+        os.nice(19)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        if sys.platform.startswith("linux"):
+            syscall_numbers = {"x86_64": 251, "aarch64": 30, "i686": 289, "i386": 289, "armv7l": 314}
+            number = syscall_numbers.get(os.uname().machine)
+            if number:
+                IOPRIO_WHO_PROCESS, IOPRIO_CLASS_IDLE = 1, 3
+                libc.syscall(number, IOPRIO_WHO_PROCESS, 0, IOPRIO_CLASS_IDLE << 13)
+        elif sys.platform == "darwin":
+            IOPOL_TYPE_DISK, IOPOL_SCOPE_PROCESS, IOPOL_THROTTLE = 0, 0, 3
+            libc.setiopolicy_np(IOPOL_TYPE_DISK, IOPOL_SCOPE_PROCESS, IOPOL_THROTTLE)
+    except Exception as e:
+        logging.warning(f"Failed to lower worker priority: {e}")
+
+_pregeneration_index: ArchiveIndex | None = None
+
+def init_pregeneration_worker(index_path: Path):
+    global _pregeneration_index
+    lower_process_priority()
+    try:
+        _pregeneration_index = ArchiveIndex(index_path)
+    except sqlite3.Error as e:
+        logging.warning(f"Pre-generation runs without the archive index: {e}")
+
+def pregenerate_preview(pk3_path: Path, width: int, scorer: PreviewScorer | None = None) -> tuple | None:
+    # Runs in a low-priority worker process, central directory parsing included.
+    st = pk3_path.stat()
+    entries = None
+    if _pregeneration_index is not None:
+        try:
+            entries = _pregeneration_index.entries(pk3_path)
+        except sqlite3.Error as e:
+            logging.warning(f"Archive index unavailable for {pk3_path.name}: {e}")
+    if entries is None:
+        entries = read_central_directory(pk3_path)
+    best_match = find_preview_entry([entry[0] for entry in entries], scorer)
+    if not best_match:
+        return None
+    key = ThumbnailCache.make_key(pk3_path, st, best_match, width)
+    if any((THUMBNAIL_DIR / f"{key}{suffix}").exists() for suffix in (".jpg", ".png")):
+        return None
+    entry = next(entry for entry in entries if entry[0] == best_match)
+    img = decode_preview_image(read_archive_entry(pk3_path, entry), width)
+    return (key, *ThumbnailCache.encode(img))
+
+# Thumbnail Cache
+class ThumbnailCache:
+    def __init__(self, directory: Path, budget_bytes: int):
+        self.directory = directory
+        self.budget_bytes = budget_bytes
+        self.lock = threading.Lock()
+        self.files: collections.OrderedDict[str, tuple[str, int]] = collections.OrderedDict()
+        self.total_bytes = 0
+        directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                key = entry.name.rsplit(".", 1)[0]
+                found.append((st.st_mtime_ns, key, entry.name, st.st_size))
+        for _, key, filename, size in sorted(found):
+            self.files[key] = (filename, size)
+            self.total_bytes += size
+        self._evict()
+
+    @staticmethod
+    def make_key(pk3_path: Path, st: os.stat_result, entry: str, width: int) -> str:
+        identity = f"{pk3_path}|{st.st_size}|{st.st_mtime_ns}|{st.st_ino}|{entry}|{width}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Image.Image | None:
+        with self.lock:
+            item = self.files.get(key)
+            if item is None:
+                return None
+            self.files.move_to_end(key)
+        path = self.directory / item[0]
+        try:
+            os.utime(path)
+            with Image.open(path) as img:
+                img.load()
+                return img
+        except OSError as e:
+            logging.warning(f"Dropping unreadable thumbnail {path.name}: {e}")
+            self.discard(key)
+            return None
+
+    @staticmethod
+    def encode(img: Image.Image) -> tuple[str, bytes]:
+        buf = io.BytesIO()
+        if img.mode == "RGB":
+            img.save(buf, "JPEG", quality=90)
+            return ".jpg", buf.getvalue()
+        img.save(buf, "PNG")
+        return ".png", buf.getvalue()
+
+    def contains(self, key: str) -> bool:
+        with self.lock:
+            return key in self.files
+
+    def put(self, key: str, img: Image.Image):
+        self.put_encoded(key, *self.encode(img))
+
+    def put_encoded(self, key: str, suffix: str, data: bytes):
+        filename = f"{key}{suffix}"
+        path = self.directory / filename
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            size = len(data)
+        except OSError as e:
+            logging.error(f"Failed to store thumbnail {filename}: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+        with self.lock:
+            old = self.files.pop(key, None)
+            if old:
+                self.total_bytes -= old[1]
+            self.files[key] = (filename, size)
+            self.total_bytes += size
+            self._evict()
+
+    def discard(self, key: str):
+        with self.lock:
+            item = self.files.pop(key, None)
+            if item:
+                self.total_bytes -= item[1]
+        if item:
+            (self.directory / item[0]).unlink(missing_ok=True)
+
+    def _evict(self):
+        while self.total_bytes > self.budget_bytes and self.files:
+            _, (filename, size) = self.files.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                (self.directory / filename).unlink()
+            except OSError:
+                pass
+
+# Folder Watcher
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+INOTIFY_EVENT = struct.Struct("iIII")
+
+class FolderWatcher:
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, mod_folder: Path, catalog: ModCatalog, callback):
+        self.mod_folder = mod_folder
+        self.directories = [mod_folder, mod_folder / DISABLED_DIR_NAME]
+        self.catalog = catalog
+        self.callback = callback
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _emit(self, changes: list[tuple]):
+        if changes and not self.stop_event.is_set():
+            self.callback(changes)
+
+    def _run(self):
+        if sys.platform.startswith("linux"):
+            try:
+                self._run_inotify()
+                return
+            except OSError as e:
+                logging.warning(f"inotify unavailable, falling back to polling: {e}")
+        self._run_polling()
+
+    def _run_polling(self):
+        while not self.stop_event.wait(self.POLL_INTERVAL):
+            try:
+                self._emit(self.catalog.reconcile(self.directories))
+            except Exception as e:
+                logging.error(f"Folder poll failed: {e}")
+
+    def _run_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watches: dict[int, Path] = {}
+
+        def add_watch(directory: Path):
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), INOTIFY_MASK)
+            if wd >= 0:
+                watches[wd] = directory
+
+        try:
+            for directory in self.directories:
+                if directory.is_dir():
+                    add_watch(directory)
+            if not watches:
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+            while not self.stop_event.is_set():
+                ready, _, _ = select.select([fd], [], [], 0.5)
+                if not ready:
+                    continue
+                # Let bursts (bulk copies, batch toggles) coalesce into one read.
+                time.sleep(0.05)
+                try:
+                    buf = os.read(fd, 256 * 1024)
+                except BlockingIOError:
+                    continue
+                self._emit(self._parse_inotify(buf, watches, add_watch))
+        finally:
+            os.close(fd)
+
+    def _parse_inotify(self, buf: bytes, watches: dict[int, Path], add_watch) -> list[tuple]:
+        changes = []
+        moved_from: dict[int, Path] = {}
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(buf):
+            wd, mask, cookie, length = INOTIFY_EVENT.unpack_from(buf, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(buf[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                return self.catalog.reconcile(self.directories)
+            directory = watches.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                watches.pop(wd, None)
+                continue
+            if mask & IN_ISDIR:
+                if directory == self.mod_folder and name == DISABLED_DIR_NAME and mask & (IN_CREATE | IN_MOVED_TO):
+                    add_watch(directory / name)
+                    changes.extend(self.catalog.reconcile([directory / name]))
+                continue
+            if not name.lower().endswith(".pk3"):
+                continue
+            path = directory / name
+            if mask & IN_MOVED_FROM:
+                moved_from[cookie] = path
+            elif mask & IN_MOVED_TO:
+                src = moved_from.pop(cookie, None)
+                if src is not None:
+                    self.catalog.record_move(src, path)
+                    changes.append(("moved", src, path))
+                else:
+                    self.catalog.record_add(path)
+                    changes.append(("added", path))
+            elif mask & IN_CREATE:
+                self.catalog.record_add(path)
+                changes.append(("added", path))
+            elif mask & IN_CLOSE_WRITE:
+                self.catalog.record_add(path)
+                changes.append(("modified", path))
+            elif mask & IN_DELETE:
+                self.catalog.record_remove(path)
+                changes.append(("removed", path))
+        for src in moved_from.values():
+            self.catalog.record_remove(src)
+            changes.append(("removed", src))
+        return changes
+
+# Mod Search
+class ModSearchIndex:
+    # Postings covering more than this share of the names are cheaper to
+    # answer with a straight scan than with set intersections.
+    SCAN_RATIO = 0.25
+
+    def __init__(self):
+        self.keys: list[str | None] = []
+        self.names: list[str | None] = []
+        self.ids: dict[str, int] = {}
+        self.trigrams: dict[str, set[int]] | None = None
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.last_query = ""
+        self.last_hits: list[int] | None = None
+
+    @staticmethod
+    def _grams(text: str) -> set[str]:
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def rebuild(self, names: dict[str, str]):
+        self.keys = list(names)
+        self.names = [name.lower() for name in names.values()]
+        self.ids = {key: i for i, key in enumerate(self.keys)}
+        self.last_hits = None
+        self._start_build()
+
+    def _start_build(self):
+        with self.lock:
+            self.trigrams = None
+            self.generation += 1
+            generation = self.generation
+        threading.Thread(target=self._build_trigrams, args=(generation, list(self.names)), daemon=True).start()
+
+    def add(self, key: str, name: str):
+        self.remove(key)
+        name = name.lower()
+        idx = len(self.keys)
+        self.keys.append(key)
+        self.names.append(name)
+        self.ids[key] = idx
+        self.last_hits = None
+        with self.lock:
+            if self.trigrams is not None:
+                for gram in self._grams(name):
+                    self.trigrams.setdefault(gram, set()).add(idx)
+                return
+        self._start_build()
+
+    def remove(self, key: str):
+        idx = self.ids.pop(key, None)
+        if idx is None:
+            return
+        name = self.names[idx]
+        self.keys[idx] = self.names[idx] = None
+        self.last_hits = None
+        with self.lock:
+            if self.trigrams is not None:
+                for gram in self._grams(name):
+                    self.trigrams[gram].discard(idx)
+                return
+        self._start_build()
+
+    def _build_trigrams(self, generation: int, names: list[str | None]):
+        trigrams: dict[str, set[int]] = {}
+        for idx, name in enumerate(names):
+            if name is None:
+                continue
+            for gram in self._grams(name):
+                postings = trigrams.get(gram)
+                if postings is None:
+                    trigrams[gram] = {idx}
+                else:
+                    postings.add(idx)
+        with self.lock:
+            if generation == self.generation:
+                self.trigrams = trigrams
+
+    def _search_ids(self, query: str) -> list[int]:
+        names = self.names
+        # Typing usually extends the previous query, so narrow its hits.
+        if self.last_hits is not None and self.last_query and self.last_query in query:
+            return [i for i in self.last_hits if query in names[i]]
+        trigrams = self.trigrams
+        # Until the background build lands, queries fall back to a scan.
+        if len(query) >= 3 and trigrams is not None:
+            postings = sorted((trigrams.get(gram, set()) for gram in self._grams(query)), key=len)
+            if len(postings[0]) < len(self.ids) * self.SCAN_RATIO:
+                candidates = postings[0].intersection(*postings[1:]) if len(postings) > 1 else postings[0]
+                return sorted(i for i in candidates if query in names[i])
+        return [i for i, name in enumerate(names) if name is not None and query in name]
+
+    def search(self, query: str) -> set[str] | None:
+        query = query.lower()
+        if not query:
+            self.last_query, self.last_hits = "", None
+            return None
+        hits = self._search_ids(query)
+        self.last_query, self.last_hits = query, hits
+        keys = self.keys
+        return {keys[i] for i in hits}
+
+# Mod Database
+MOD_DATABASE_URL = base64.b64decode("".join([
+    "aHR0cHM6Ly9qazJ0",
+    "LmRkbnMubmV0L21v",
+    "ZG1hbmFnZXIvbW9k",
+    "cy5qc29u"
+])).decode("utf-8")
+
+class ModDatabaseClient:
+    def __init__(self, url: str, cache_path: Path, ttl_seconds: float, session=None):
+        self.url = url
+        self.cache_path = cache_path
+        self.ttl_seconds = ttl_seconds
+        self.session = session or requests
+        self.lock = threading.Lock()
+        self.mods: list[dict] = []
+        self.by_url: dict[str, dict] = {}
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.fetched_at = 0.0
+        # Bumped whenever the mod list changes, so derived indexes know to rebuild.
+        self.version = 0
+        self._load_cache()
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            self._set_mods(cached["mods"])
+            self.etag = cached.get("etag")
+            self.last_modified = cached.get("last_modified")
+            self.fetched_at = float(cached.get("fetched_at", 0))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable mod database cache: {e}")
+
+    def _save_cache(self):
+        tmp = self.cache_path.with_suffix(".tmp")
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({
+                    "etag": self.etag,
+                    "last_modified": self.last_modified,
+                    "fetched_at": self.fetched_at,
+                    "mods": self.mods,
+                }, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logging.error(f"Failed to write mod database cache: {e}")
+            tmp.unlink(missing_ok=True)
+
+    def _set_mods(self, mods: list[dict]):
+        mods = [mod for mod in mods if isinstance(mod, dict) and mod.get("download_url")]
+        with self.lock:
+            self.mods = mods
+            self.by_url = {mod["download_url"]: mod for mod in mods}
+            self.version += 1
+
+    def snapshot(self) -> tuple[list[dict], int]:
+        with self.lock:
+            return self.mods, self.version
+
+    def get(self, download_url: str) -> dict | None:
+        return self.by_url.get(download_url)
+
+    def is_stale(self) -> bool:
+        return not self.mods or time.time() - self.fetched_at >= self.ttl_seconds
+
+    def refresh(self, force: bool = False) -> bool:
+        if not force and not self.is_stale():
+            return False
+        headers = {}
+        if self.mods:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        response = self.session.get(self.url, headers=headers, timeout=5)
+        if response.status_code == 304:
+            self.fetched_at = time.time()
+            self._save_cache()
+            return False
+        response.raise_for_status()
+        mods = response.json()
+        if not isinstance(mods, list):
+            raise ValueError("Mod database is not a list.")
+        self._set_mods(mods)
+        self.etag = response.headers.get("ETag")
+        self.last_modified = response.headers.get("Last-Modified")
+        self.fetched_at = time.time()
+        self._save_cache()
+        return True
+
+class DownloadSearchIndex:
+    FIELD_WEIGHTS = {"name": 4, "category": 3, "author": 2, "uploader": 1}
+    TOKEN = re.compile(r"[a-z0-9]+")
+    # Relative strength of each way a query term can match an indexed token
+    EXACT, PREFIX, INFIX, FUZZY = 1.0, 0.75, 0.5, 0.4
+    MEMO_LIMIT = 256
+
+    def __init__(self, weights: dict | None = None):
+        self.weights = {field: float(weight) for field, weight in {**self.FIELD_WEIGHTS, **(weights or {})}.items()}
+        self.lock = threading.Lock()
+        self.version = None
+        self.mods: list[dict] = []
+        self.sort_names: list[str] = []
+        self.vocab: list[str] = []
+        self.postings: dict[str, dict[int, float]] = {}
+        self.deletes: dict[str, list[str]] = {}
+        self.memo: dict[str, dict[int, float]] = {}
+
+    @staticmethod
+    def _deletes(token: str) -> set[str]:
+        return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+    def ensure(self, mods: list[dict], version: int):
+        with self.lock:
+            if version == self.version:
+                return
+            postings: dict[str, dict[int, float]] = {}
+            for doc, mod in enumerate(mods):
+                weights: dict[str, float] = {}
+                for field, weight in self.weights.items():
+                    for token in set(self.TOKEN.findall(str(mod.get(field) or "").lower())):
+                        weights[token] = weights.get(token, 0) + weight
+                for token, weight in weights.items():
+                    postings.setdefault(token, {})[doc] = weight
+            deletes: dict[str, list[str]] = {}
+            for token in postings:
+                if len(token) >= 4:
+                    for variant in self._deletes(token):
+                        deletes.setdefault(variant, []).append(token)
+            self.mods = mods
+            self.sort_names = [str(mod.get("name", "")).lower() for mod in mods]
+            self.vocab = sorted(postings)
+            self.postings = postings
+            self.deletes = deletes
+            self.memo = {}
+            self.version = version
+
+    def _fuzzy_tokens(self, term: str) -> set[str]:
+        # Deletion neighbourhoods meet for one insert, delete, substitution
+        # or transposition, without comparing against the whole vocabulary.
+        found = set(self.deletes.get(term, ()))
+        for variant in self._deletes(term):
+            if variant in self.postings:
+                found.add(variant)
+            found.update(self.deletes.get(variant, ()))
+        return found
+
+    def _term_matches(self, term: str) -> dict[int, float]:
+        matches = self.memo.get(term)
+        if matches is not None:
+            return matches
+        matches = {}
+        postings = self.postings
+
+        def add(token: str, quality: float):
+            for doc, weight in postings[token].items():
+                score = weight * quality
+                if score > matches.get(doc, 0):
+                    matches[doc] = score
+
+        vocab = self.vocab
+        i = bisect.bisect_left(vocab, term)
+        while i < len(vocab) and vocab[i].startswith(term):
+            add(vocab[i], self.EXACT if vocab[i] == term else self.PREFIX)
+            i += 1
+        if len(term) >= 3:
+            for token in vocab:
+                if term in token and not token.startswith(term):
+                    add(token, self.INFIX)
+        if len(term) >= 4:
+            for token in self._fuzzy_tokens(term):
+                if term not in token:
+                    add(token, self.FUZZY)
+        if len(self.memo) >= self.MEMO_LIMIT:
+            self.memo.clear()
+        self.memo[term] = matches
+        return matches
+
+    def search(self, query: str) -> list[dict] | None:
+        terms = self.TOKEN.findall(query.lower())
+        if not terms:
+            return None
+        with self.lock:
+            scores: dict[int, float] | None = None
+            for term in sorted(set(terms), key=len, reverse=True):
+                matches = self._term_matches(term)
+                if scores is None:
+                    scores = dict(matches)
+                else:
+                    scores = {doc: score + matches[doc] for doc, score in scores.items() if doc in matches}
+                if not scores:
+                    return []
+            names = self.sort_names
+            mods = self.mods
+            return [mods[doc] for doc in sorted(scores, key=lambda doc: (-scores[doc], names[doc]))]
+
+# Downloads
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_TIMEOUT = (10, 30)
+DOWNLOAD_UPDATE_INTERVAL = 0.25
+# Files at least this big are split into parallel range requests when the
+# server supports them; no segment is made smaller than the second value.
+SEGMENTED_DOWNLOAD_MIN_SIZE = 16 * 1024 * 1024
+DOWNLOAD_SEGMENT_MIN_SIZE = 4 * 1024 * 1024
+
+def make_http_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(pool_size, 4))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers["User-Agent"] = f"monolith/{APP_VERSION}"
+    return session
+
+class DownloadStopped(Exception):
+    pass
+
+def partial_download_paths(target: Path) -> tuple[Path, Path]:
+    part = target.with_name(f".{target.name}.part")
+    return part, part.with_name(part.name + ".meta")
+
+def discard_partial_download(target: Path):
+    for path in partial_download_paths(target):
+        path.unlink(missing_ok=True)
+
+def _read_download_meta(meta_path: Path, url: str) -> dict | None:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if meta.get("url") == url else None
+
+def _write_download_meta(meta_path: Path, meta: dict):
+    tmp = meta_path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+def _range_validator(meta: dict) -> str | None:
+    # If-Range needs a strong ETag or a Last-Modified date; without one
+    # a changed file could be spliced onto stale bytes, so start over.
+    etag = meta.get("etag")
+    return etag if etag and not etag.startswith("W/") else meta.get("last_modified")
+
+def _content_range(response) -> tuple[int, int | None] | None:
+    match = re.match(r"bytes (\d+)-\d+/(\d+|\*)", response.headers.get("Content-Range", ""))
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2)) if match.group(2) != "*" else None
+
+def partial_download_progress(target: Path, url: str) -> tuple[int, int]:
+    part, meta_path = partial_download_paths(target)
+    if not part.exists():
+        return 0, 0
+    meta = _read_download_meta(meta_path, url) or {}
+    if meta.get("segments"):
+        return sum(seg[2] for seg in meta["segments"]), meta.get("total", 0)
+    return part.stat().st_size, meta.get("total", 0)
+
+def _transfer_to_part(session, url: str, part: Path, meta_path: Path, progress, stop, segments: int):
+    offset = part.stat().st_size if part.exists() else 0
+    meta = _read_download_meta(meta_path, url) if offset else None
+    validator = _range_validator(meta) if meta else None
+    if meta and meta.get("segments"):
+        if validator and offset == meta.get("total"):
+            return _transfer_segments(session, url, part, meta_path, meta, validator, None, progress, stop)
+        meta = validator = None
+    if validator:
+        headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+    else:
+        # An open range costs nothing extra and tells us whether the server
+        # can serve the rest of the file in parallel segments.
+        offset = 0
+        headers = {"Range": "bytes=0-"} if segments > 1 else {}
+    with session.get(url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        if response.status_code == 416:
+            if meta and meta.get("total") == offset:
+                return
+            part.unlink(missing_ok=True)
+            raise IOError("Server rejected the resume range, restarting.")
+        response.raise_for_status()
+        if response.status_code == 206 and headers:
+            content_range = _content_range(response)
+            if not content_range or content_range[0] != offset:
+                raise IOError("Server returned an unexpected byte range.")
+            total = content_range[1] or (meta or {}).get("total", 0)
+        else:
+            offset = 0
+            total = int(response.headers.get("content-length", 0))
+        if not offset:
+            meta = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "total": total,
+            }
+            validator = _range_validator(meta)
+            if response.status_code == 206 and validator and total >= SEGMENTED_DOWNLOAD_MIN_SIZE:
+                return _transfer_segments(session, url, part, meta_path, meta, validator, response, progress, stop, segments)
+            _write_download_meta(meta_path, meta)
+        done = offset
+        if progress:
+            progress(done, total)
+        with open(part, "ab" if offset else "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                if stop and stop():
+                    raise DownloadStopped()
+                f.write(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done, total)
+            f.flush()
+            os.fsync(f.fileno())
+    if total and done != total:
+        raise IOError(f"Connection closed after {done} of {total} bytes.")
+
+def _transfer_segments(session, url: str, part: Path, meta_path: Path, meta: dict, validator: str,
+                       first_response, progress, stop, count: int = 1):
+    total = meta["total"]
+    if first_response is not None:
+        count = max(1, min(count, total // DOWNLOAD_SEGMENT_MIN_SIZE))
+        size = -(-total // count)
+        meta["segments"] = [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+        with open(part, "wb") as f:
+            try:
+                os.posix_fallocate(f.fileno(), 0, total)
+            except (AttributeError, OSError):
+                f.truncate(total)
+        _write_download_meta(meta_path, meta)
+    segments = meta["segments"]
+    lock = threading.Lock()
+    checkpoint_lock = threading.Lock()
+    failed = threading.Event()
+    restart = threading.Event()
+    last_checkpoint = [time.monotonic()]
+    # Windows has no pwrite, so each segment gets its own unbuffered handle.
+    positional = hasattr(os, "pwrite")
+    fd = os.open(part, os.O_RDWR | getattr(os, "O_BINARY", 0))
+
+    def checkpoint():
+        # Snapshot before syncing so the meta never claims unsynced bytes;
+        # one checkpoint at a time so the meta file is never written twice.
+        with checkpoint_lock:
+            with lock:
+                snapshot = [list(seg) for seg in segments]
+            os.fsync(fd)
+            _write_download_meta(meta_path, {**meta, "segments": snapshot})
+
+    def fetch_segment(seg: list, response):
+        start, end = seg[0], seg[1]
+        pos = start + seg[2]
+        if pos > end:
+            return
+        if response is None:
+            response = session.get(
+                url, headers={"Range": f"bytes={pos}-{end}", "If-Range": validator},
+                stream=True, timeout=DOWNLOAD_TIMEOUT
+            )
+        handle = None if positional else open(part, "r+b", buffering=0)
+        try:
+            with response:
+                response.raise_for_status()
+                if response.status_code != 206:
+                    restart.set()
+                    raise IOError("File changed on the server, restarting.")
+                content_range = _content_range(response)
+                if not content_range or content_range[0] != pos:
+                    raise IOError("Server returned an unexpected byte range.")
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    if failed.is_set() or (stop and stop()):
+                        raise DownloadStopped()
+                    view = memoryview(chunk)[:end + 1 - pos]
+                    while view:
+                        if positional:
+                            written = os.pwrite(fd, view, pos)
+                        else:
+                            handle.seek(pos)
+                            written = handle.write(view)
+                        view = view[written:]
+                        pos += written
+                    now = time.monotonic()
+                    with lock:
+                        seg[2] = pos - start
+                        done = sum(s[2] for s in segments)
+                        due = now - last_checkpoint[0] >= 1.0
+                        if due:
+                            last_checkpoint[0] = now
+                    if progress:
+                        progress(done, total)
+                    if due:
+                        checkpoint()
+                    if pos > end:
+                        break
+            if pos <= end:
+                raise IOError(f"Segment closed after {pos - start} of {end + 1 - start} bytes.")
+        finally:
+            if handle:
+                handle.close()
+
+    try:
+        if progress:
+            progress(sum(seg[2] for seg in segments), total)
+        pending = [seg for seg in segments if seg[0] + seg[2] <= seg[1]]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(pending))) as pool:
+            futures = [
+                pool.submit(fetch_segment, seg, first_response if seg[0] == 0 else None)
+                for seg in pending
+            ]
+            concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_EXCEPTION)
+            failed.set()
+        errors = [f.exception() for f in futures if f.exception()]
+        if errors:
+            checkpoint()
+            raise next((e for e in errors if not isinstance(e, DownloadStopped)), errors[0])
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+        if restart.is_set():
+            part.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+
+def fetch_to_file(session, url: str, target: Path, progress=None, stop=None, retries: int = 3, segments: int = 1):
+    part, meta_path = partial_download_paths(target)
+    for attempt in range(retries):
+        try:
+            _transfer_to_part(session, url, part, meta_path, progress, stop, segments)
+            break
+        except DownloadStopped:
+            raise
+        except requests.HTTPError as e:
+            status = e.response.status_code if e.response is not None else 0
+            if 400 <= status < 500 and status not in (408, 429) or attempt == retries - 1:
+                raise
+        except (requests.RequestException, OSError):
+            if attempt == retries - 1:
+                raise
+        logging.warning(f"Download of {target.name} interrupted, resuming (attempt {attempt + 2}/{retries})")
+        deadline = time.monotonic() + 2 ** attempt
+        while time.monotonic() < deadline:
+            if stop and stop():
+                raise DownloadStopped()
+            time.sleep(0.1)
+    os.replace(part, target)
+    meta_path.unlink(missing_ok=True)
+    fsync_dir(target.parent)
+
+class DownloadItem:
+    def __init__(self, url: str, target: Path, name: str):
+        self.url = url
+        self.target = target
+        self.name = name
+        self.state = "queued"
+        self.done = 0
+        self.total = 0
+        self.rate = 0.0
+        self.error: str | None = None
+        # A worker may still be winding down after a pause; it owns the part
+        # file until it exits, and only the worker of the current generation
+        # may keep transferring.
+        self.running = False
+        self.generation = 0
+
+    def eta(self) -> float | None:
+        if self.state != "active" or not self.total or self.rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / self.rate
+
+class DownloadManager:
+    def __init__(self, session: requests.Session, concurrency: int, on_update, on_finished,
+                 state_path: Path | None = None, segments: int = 1):
+        self.session = session
+        self.concurrency = max(1, concurrency)
+        self.segments = max(1, segments)
+        self.on_update = on_update
+        self.on_finished = on_finished
+        self.state_path = state_path
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.items: dict[str, DownloadItem] = {}
+        self.queue: collections.deque[DownloadItem] = collections.deque()
+        self.active = 0
+        self.closed = False
+
+    def restore(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logging.warning(f"Ignoring unreadable download queue: {e}")
+            return
+        with self.lock:
+            for entry in saved:
+                item = DownloadItem(entry["url"], Path(entry["target"]), entry["name"])
+                # Transfers cut off by the last shutdown go back in the queue.
+                item.state = "queued" if entry["state"] in ("queued", "active") else entry["state"]
+                item.error = entry.get("error")
+                item.done, item.total = partial_download_progress(item.target, item.url)
+                self.items[item.url] = item
+                if item.state == "queued":
+                    self.queue.append(item)
+        for item in list(self.items.values()):
+            self.on_update(item)
+        self._pump()
+
+    def _save_state(self):
+        if not self.state_path or self.closed:
+            return
+        # The Tk thread and every worker save here; snapshotting and writing
+        # under one lock keeps a stale snapshot from replacing a newer one.
+        with self.save_lock:
+            with self.lock:
+                saved = [
+                    {"url": item.url, "target": str(item.target), "name": item.name, "state": item.state, "error": item.error}
+                    for item in self.items.values() if item.state != "done"
+                ]
+            tmp = self.state_path.with_suffix(".tmp")
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(saved, f)
+                os.replace(tmp, self.state_path)
+            except OSError as e:
+                logging.error(f"Failed to save download queue: {e}")
+
+    def enqueue(self, url: str, target: Path, name: str) -> DownloadItem:
+        with self.lock:
+            item = self.items.get(url)
+            if item and item.state in ("queued", "active"):
+                return item
+            item = DownloadItem(url, target, name)
+            self.items[url] = item
+            self.queue.append(item)
+        self._save_state()
+        self.on_update(item)
+        self._pump()
+        return item
+
+    def pause(self, url: str):
+        with self.lock:
+            item = self.items.get(url)
+            if not item or item.state not in ("queued", "active"):
+                return
+            if item in self.queue:
+                self.queue.remove(item)
+            # Active workers notice the state change at their next chunk.
+            item.state = "paused"
+            item.rate = 0.0
+        self._save_state()
+        self.on_update(item)
+
+    def resume(self, url: str):
+        with self.lock:
+            item = self.items.get(url)
+            if not item or item.state not in ("paused", "failed"):
+                return
+            item.state = "queued"
+            item.error = None
+            # A worker that has not exited yet requeues the item itself.
+            if not item.running:
+                self.queue.append(item)
+        self._save_state()
+        self.on_update(item)
+        self._pump()
+
+    def remove(self, url: str) -> DownloadItem | None:
+        with self.lock:
+            item = self.items.get(url)
+            if not item or item.state == "active" or item.running:
+                return None
+            if item in self.queue:
+                self.queue.remove(item)
+            del self.items[url]
+        if item.state != "done":
+            discard_partial_download(item.target)
+        self._save_state()
+        return item
+
+    def remove_finished(self) -> list[DownloadItem]:
+        with self.lock:
+            removed = [item for item in self.items.values() if item.state == "done"]
+            for item in removed:
+                del self.items[item.url]
+        return removed
+
+    def set_concurrency(self, concurrency: int):
+        self.concurrency = max(1, concurrency)
+        self._pump()
+
+    def counts(self) -> dict[str, int]:
+        counts = collections.Counter(item.state for item in list(self.items.values()))
+        return {state: counts.get(state, 0) for state in ("queued", "active", "paused", "done", "failed")}
+
+    def totals(self) -> tuple[int, int, float]:
+        done = total = 0
+        rate = 0.0
+        for item in list(self.items.values()):
+            if item.state in ("queued", "active"):
+                done += item.done
+                total += item.total
+                rate += item.rate
+        return done, total, rate
+
+    def is_idle(self) -> bool:
+        with self.lock:
+            return not self.active and not self.queue
+
+    def shutdown(self):
+        # Leave the saved queue as it is so the next start picks it up again.
+        with self.lock:
+            self.closed = True
+            self.queue.clear()
+
+    def _pump(self):
+        started = []
+        with self.lock:
+            while not self.closed and self.queue and self.active < self.concurrency:
+                item = self.queue.popleft()
+                item.state = "active"
+                item.rate = 0.0
+                item.running = True
+                item.generation += 1
+                self.active += 1
+                started.append((item, item.generation))
+        for item, generation in started:
+            self.on_update(item)
+            threading.Thread(target=self._run, args=(item, generation), daemon=True).start()
+
+    def _run(self, item: DownloadItem, generation: int):
+        try:
+            self._transfer(item, generation)
+            with self.lock:
+                item.state = "done"
+                item.rate = 0.0
+        except DownloadStopped:
+            pass
+        except Exception as e:
+            logging.error(f"Failed to download {item.name}: {e}")
+            with self.lock:
+                item.state = "failed"
+                item.error = str(e)
+                item.rate = 0.0
+        finally:
+            with self.lock:
+                self.active -= 1
+                item.running = False
+                if item.state == "queued" and not self.closed:
+                    self.queue.append(item)
+        self._save_state()
+        self.on_update(item)
+        if item.state in ("done", "failed"):
+            self.on_finished(item)
+        self._pump()
+
+    def _transfer(self, item: DownloadItem, generation: int):
+        last = [time.monotonic(), None]
+
+        def progress(done: int, total: int):
+            item.done, item.total = done, total
+            now = time.monotonic()
+            if last[1] is None or done < last[1]:
+                last[:] = [now, done]
+            elif now - last[0] >= DOWNLOAD_UPDATE_INTERVAL:
+                rate = (done - last[1]) / (now - last[0])
+                item.rate = rate if not item.rate else item.rate * 0.7 + rate * 0.3
+                last[:] = [now, done]
+                self.on_update(item)
+
+        fetch_to_file(
+            self.session, item.url, item.target, progress,
+            lambda: item.generation != generation or item.state != "active" or self.closed,
+            segments=self.segments
+        )
+
 # UI Components
 class CTkTextbox(ctk.CTkTextbox):
     def __init__(self, master, **kwargs):
         wrap_mode = kwargs.pop("wrap", "word")
         super().__init__(master, wrap=wrap_mode, **kwargs)
 
+class VirtualTreeview:
+    OVERSCAN = 2
+
+    def __init__(self, tree: ttk.Treeview, scrollbar: ttk.Scrollbar, on_select=None):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.on_select = on_select
+        self.keys: list[str] = []
+        self.rows: dict[str, tuple[tuple, tuple]] = {}
+        self.selected: set[str] = set()
+        self.anchor: str | None = None
+        self.cursor: str | None = None
+        self.first = 0
+        self.slot_rows: list[tuple[tuple, tuple]] = []
+        self.slot_selection: list[str] = []
+        self.render_pending = False
+
+        tree.configure(yscrollcommand=lambda *args: None)
+        scrollbar.config(command=self.yview)
+        tree.bind("<Configure>", lambda e: self.schedule_render())
+        tree.bind("<MouseWheel>", self._on_mousewheel)
+        tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        tree.bind("<Button-5>", lambda e: self.scroll(3))
+        tree.bind("<Button-1>", self._on_click)
+        tree.bind("<Shift-Button-1>", lambda e: self._on_click(e, extend=True))
+        tree.bind("<Control-Button-1>", lambda e: self._on_click(e, toggle=True))
+        tree.bind("<Control-a>", lambda e: self.select(self.keys))
+        for sequence, delta in (("Up", -1), ("Down", 1), ("Prior", "page_up"), ("Next", "page_down"), ("Home", "home"), ("End", "end")):
+            tree.bind(f"<{sequence}>", lambda e, d=delta: self._on_key(d))
+            tree.bind(f"<Shift-{sequence}>", lambda e, d=delta: self._on_key(d, extend=True))
+
+    # Model
+    def set_rows(self, keys: list[str], rows: dict[str, tuple[tuple, tuple]]):
+        # Keep the viewport anchored on the row that was on top, so a
+        # rebuild does not jump back to the start of the list.
+        top = self.keys[self.first] if self.first < len(self.keys) else None
+        self.keys = keys
+        self.rows = rows
+        if top in rows:
+            self.first = keys.index(top)
+        self.selected &= rows.keys()
+        self.schedule_render()
+
+    def rename(self, old_key: str, new_key: str):
+        if old_key in self.selected:
+            self.selected.discard(old_key)
+            self.selected.add(new_key)
+        if self.anchor == old_key:
+            self.anchor = new_key
+        if self.cursor == old_key:
+            self.cursor = new_key
+
+    def insert(self, index: int, key: str, row: tuple[tuple, tuple]):
+        self.keys.insert(index, key)
+        self.rows[key] = row
+        if index < self.first:
+            self.first += 1
+        self.schedule_render()
+
+    def delete(self, index: int):
+        key = self.keys.pop(index)
+        self.rows.pop(key, None)
+        self.selected.discard(key)
+        if index < self.first:
+            self.first -= 1
+        self.schedule_render()
+
+    def update(self, key: str, row: tuple[tuple, tuple]):
+        self.rows[key] = row
+        self.schedule_render()
+
+    def selection(self) -> list[str]:
+        if not self.selected:
+            return []
+        return [key for key in self.keys if key in self.selected]
+
+    def select(self, keys: list[str]):
+        self.selected = set(keys) & self.rows.keys()
+        if keys and keys[0] in self.rows:
+            self.anchor = self.cursor = keys[0]
+            self.see(self.keys.index(keys[0]))
+        self._selection_changed()
+        return "break"
+
+    def key_at(self, y: int) -> str | None:
+        slot = self.tree.identify_row(y)
+        if not slot:
+            return None
+        index = self.first + int(slot.rsplit("_", 1)[1])
+        return self.keys[index] if index < len(self.keys) else None
+
+    # Viewport
+    def visible_rows(self) -> int:
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        bbox = self.tree.bbox("slot_0") if self.slot_rows else None
+        header = bbox[1] if bbox else row_height
+        return max(1, (self.tree.winfo_height() - header) // row_height)
+
+    def see(self, index: int):
+        visible = self.visible_rows()
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + visible:
+            self.first = index - visible + 1
+
+    def scroll(self, rows: int):
+        self.first += rows
+        self.render()
+        return "break"
+
+    def yview(self, *args):
+        visible = self.visible_rows()
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.keys))
+        elif args[0] == "scroll":
+            step = visible if args[2] == "pages" else 1
+            self.first += int(args[1]) * step
+        self.render()
+
+    def schedule_render(self):
+        if not self.render_pending:
+            self.render_pending = True
+            self.tree.after_idle(self.render)
+
+    def render(self):
+        self.render_pending = False
+        visible = self.visible_rows()
+        total = len(self.keys)
+        self.first = max(0, min(self.first, total - visible))
+        window = self.keys[self.first:self.first + visible + self.OVERSCAN]
+        # Only slots whose content changed are sent to Tk.
+        for i, key in enumerate(window):
+            row = self.rows[key]
+            if i >= len(self.slot_rows):
+                self.tree.insert("", "end", iid=f"slot_{i}", values=row[0], tags=row[1])
+                self.slot_rows.append(row)
+            elif self.slot_rows[i] != row:
+                self.tree.item(f"slot_{i}", values=row[0], tags=row[1])
+                self.slot_rows[i] = row
+        if len(window) < len(self.slot_rows):
+            self.tree.delete(*(f"slot_{i}" for i in range(len(window), len(self.slot_rows))))
+            del self.slot_rows[len(window):]
+        slot_selection = [f"slot_{i}" for i, key in enumerate(window) if key in self.selected]
+        if slot_selection != self.slot_selection:
+            self.tree.selection_set(slot_selection)
+            self.slot_selection = slot_selection
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # Input
+    def _selection_changed(self):
+        self.render()
+        if self.on_select:
+            self.on_select()
+
+    def _on_mousewheel(self, event):
+        if abs(event.delta) >= 120:
+            return self.scroll(-3 * (event.delta // 120))
+        return self.scroll(-event.delta)
+
+    def _on_click(self, event, extend: bool = False, toggle: bool = False):
+        if self.tree.identify_region(event.x, event.y) not in ("cell", "tree"):
+            return None
+        self.tree.focus_set()
+        key = self.key_at(event.y)
+        if key is None:
+            return "break"
+        if extend and self.anchor in self.rows:
+            a, b = sorted((self.keys.index(self.anchor), self.keys.index(key)))
+            self.selected = set(self.keys[a:b + 1])
+        elif toggle:
+            self.selected ^= {key}
+            self.anchor = key
+        else:
+            self.selected = {key}
+            self.anchor = key
+        self.cursor = key
+        self._selection_changed()
+        return "break"
+
+    def _on_key(self, delta, extend: bool = False):
+        if not self.keys:
+            return "break"
+        visible = self.visible_rows()
+        current = self.keys.index(self.cursor) if self.cursor in self.rows else self.first
+        step = {"page_up": -visible, "page_down": visible, "home": -len(self.keys), "end": len(self.keys)}.get(delta, delta)
+        index = max(0, min(len(self.keys) - 1, current + step))
+        key = self.keys[index]
+        if extend and self.anchor in self.rows:
+            a, b = sorted((self.keys.index(self.anchor), index))
+            self.selected = set(self.keys[a:b + 1])
+        else:
+            self.selected = {key}
+            self.anchor = key
+        self.cursor = key
+        self.see(index)
+        self._selection_changed()
+        return "break"
+
 class CTkInputDialog(ctk.CTkToplevel):
     def __init__(self, parent, title: str, prompt: str, initialvalue: str = ""):
         super().__init__(parent)
@@ -250,8 +2939,30 @@ class JK2ModManager(ctk.CTk):
         self.profiles: dict[str, dict] = {}
         self.mod_index: dict[str, Path] = {}
         self.config = {}
-        self.search_timer = None
         self.update_available = False
+        self.catalog = ModCatalog(CATALOG_FILE)
+        self.archive_index = ArchiveIndex(ARCHIVE_INDEX_FILE)
+        self.mod_store = ModStore(MOD_STORE_DIR)
+        self.journal = FileOpJournal(JOURNAL_FILE)
+        self.file_ops = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.conflicts = ConflictIndex(self.archive_index)
+        self.file_search = FileSearchIndex(self.archive_index)
+        self.file_search_job = None
+        self.file_search_generation = 0
+        self.file_results_window: ctk.CTkToplevel | None = None
+        self.file_results_tree: ttk.Treeview | None = None
+        self.file_results: list[tuple[str, str]] = []
+        self.index_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.catalog_reconcile_running = False
+        self.catalog_reconcile_pending = False
+        self.toggle_running = False
+        self.profile_loading = False
+        self.folder_watcher: FolderWatcher | None = None
+        self.mod_order: list[tuple[str, int, str]] = []
+        self.mod_entries: dict[str, dict] = {}
+        self.mod_all_order: list[tuple[tuple[str, int, str], str]] = []
+        self.mod_search = ModSearchIndex()
+        self.mod_search_job = None
 
         self.rcon_config = configparser.ConfigParser()
         if not os.path.exists(RCON_CONFIG_FILE):
@@ -273,6 +2984,37 @@ class JK2ModManager(ctk.CTk):
         config = self._load_config()
         self.config = config
         self.profiles = config.get("profiles", {})
+        self.thumbnail_cache = ThumbnailCache(THUMBNAIL_DIR, int(self.setting("thumbnail_cache_mb")) * 1024 * 1024)
+        try:
+            self.preview_scorer = PreviewScorer(self.setting("preview_rules"))
+        except Exception as e:
+            logging.warning(f"Invalid preview_rules in config, using defaults: {e}")
+            self.preview_scorer = PREVIEW_SCORER
+        concurrency = int(self.setting("download_concurrency"))
+        segments = int(self.setting("download_segments"))
+        self.http = make_http_session(concurrency * segments)
+        self.mod_database = ModDatabaseClient(
+            MOD_DATABASE_URL, MOD_DATABASE_CACHE, float(self.setting("mod_database_ttl_minutes")) * 60, self.http
+        )
+        self.downloads = DownloadManager(
+            self.http, concurrency, self._on_download_update, self._on_download_finished,
+            DOWNLOAD_QUEUE_FILE, segments
+        )
+        self.download_updates: dict[str, DownloadItem] = {}
+        self.download_updates_lock = threading.Lock()
+        self.download_errors: list[str] = []
+        try:
+            self.download_search = DownloadSearchIndex(self.setting("download_search_weights"))
+        except Exception as e:
+            logging.warning(f"Invalid download_search_weights in config, using defaults: {e}")
+            self.download_search = DownloadSearchIndex()
+        self.download_search_job = None
+        self.preview_images: collections.OrderedDict[str, ctk.CTkImage] = collections.OrderedDict()
+        self.preview_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+        self.preview_generation = 0
+        self.pregeneration_job = None
+        self.pregeneration_stop: threading.Event | None = None
+        self.pregeneration_folder: Path | None = None
         self.active_profile = config.get("active_profile", None)
 
         ctk.set_appearance_mode("Dark")
@@ -293,7 +3035,10 @@ class JK2ModManager(ctk.CTk):
         self.create_main_area()
         self.create_context_menu()
         self.refresh_profile_dropdown()
+        self.mod_store_var.set(bool(self.setting("mod_store")))
+        self.recover_file_operations()
         self.load_profile_folder()
+        self.downloads.restore()
         self.update_status()
         self.update_treeview_style("Dark")
         self.update_preview_style("Dark")
@@ -609,6 +3354,19 @@ class JK2ModManager(ctk.CTk):
             fg_color=COLOR_DANGER, hover_color=COLOR_WARNING, corner_radius=8
         ).pack(side="left", padx=2)
 
+        ctk.CTkButton(
+            p_frame, text="⧉", width=40, command=self.clone_profile,
+            fg_color=COLOR_ACCENT, hover_color=COLOR_PRIMARY, corner_radius=8
+        ).pack(side="left", padx=2)
+
+        self.mod_store_var = ctk.BooleanVar(value=False)
+        self.mod_store_checkbox = ctk.CTkCheckBox(
+            self.sidebar, text="Shared Mod Store", variable=self.mod_store_var,
+            onvalue=True, offvalue=False, font=ctk.CTkFont(size=12),
+            checkbox_height=18, checkbox_width=18, command=self.on_mod_store_toggled
+        )
+        self.mod_store_checkbox.grid(row=10, column=0, padx=20, pady=(5, 0), sticky="w")
+
         self.btn_check_updates = ctk.CTkButton(
             self.sidebar, text="Check for Updates",
             fg_color=DARK_BG_COLOR, hover_color=COLOR_PRIMARY,
@@ -662,9 +3420,16 @@ class JK2ModManager(ctk.CTk):
         search_bar = ctk.CTkFrame(self.mod_tab, fg_color="transparent")
         search_bar.pack(fill="x", pady=(0, 10))
 
-        ctk.CTkLabel(
+        self.lbl_search = ctk.CTkLabel(
             search_bar, text="Search Mods:",
             font=ctk.CTkFont(size=12, weight="bold")
+        )
+        self.lbl_search.pack(side="left", padx=(0, 10))
+
+        self.search_mode_var = ctk.StringVar(value="Mods")
+        ctk.CTkSegmentedButton(
+            search_bar, values=["Mods", "Files"], variable=self.search_mode_var,
+            command=self.on_search_mode_changed, font=ctk.CTkFont(size=12), corner_radius=8
         ).pack(side="left", padx=(0, 10))
 
         self.entry_search = ctk.CTkEntry(
@@ -673,6 +3438,7 @@ class JK2ModManager(ctk.CTk):
         )
         self.entry_search.pack(side="left", fill="x", expand=True)
         self.entry_search.bind("<KeyRelease>", self.on_mod_search_key_release)
+        self.entry_search.bind("<Return>", lambda e: self._run_file_search() if self._searching_files() else None)
 
         ctk.CTkButton(
             search_bar, text="Export List", width=90,
@@ -680,6 +3446,13 @@ class JK2ModManager(ctk.CTk):
             command=self.export_json, font=ctk.CTkFont(size=12), corner_radius=8
         ).pack(side="right", padx=(10, 0))
 
+        self.btn_duplicates = ctk.CTkButton(
+            search_bar, text="Duplicates", width=90,
+            fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB,
+            command=self.find_duplicates_threaded, font=ctk.CTkFont(size=12), corner_radius=8
+        )
+        self.btn_duplicates.pack(side="right", padx=(10, 0))
+
         self.content_container = ctk.CTkFrame(self.mod_tab, fg_color="transparent")
         self.content_container.pack(fill="both", expand=True, pady=(0, 10))
         self.content_container.grid_columnconfigure(0, weight=3)
@@ -696,10 +3469,9 @@ class JK2ModManager(ctk.CTk):
 
         self.tree = ttk.Treeview(
             self.tree_frame, columns=("size", "status", "priority"),
-            show="tree headings", selectmode="extended",
-            yscrollcommand=self.tree_scroll.set
+            show="tree headings", selectmode="extended"
         )
-        self.tree_scroll.config(command=self.tree.yview)
+        self.mod_list = VirtualTreeview(self.tree, self.tree_scroll, on_select=self.on_mod_selected)
 
         self.tree.column("#0", width=0, stretch=tk.NO)
         self.tree.config(displaycolumns=("size", "status", "priority"))
@@ -731,6 +3503,21 @@ class JK2ModManager(ctk.CTk):
         )
         self.preview_canvas.pack(fill="both", expand=True)
 
+        conflict_bar = ctk.CTkFrame(self.preview_frame, fg_color="transparent")
+        conflict_bar.pack(fill="x", padx=10, pady=(0, 10))
+
+        self.btn_conflicts = ctk.CTkButton(
+            conflict_bar, text="Details", width=70, command=self.show_conflicts,
+            fg_color=COLOR_SCROLL_THUMB, hover_color=COLOR_PRIMARY, corner_radius=8, state="disabled"
+        )
+        self.btn_conflicts.pack(side="right")
+
+        self.lbl_conflicts = ctk.CTkLabel(
+            conflict_bar, text="", text_color=COLOR_TEXT_DIM, font=ctk.CTkFont(size=12),
+            anchor="w", justify="left"
+        )
+        self.lbl_conflicts.pack(side="left", fill="x", expand=True)
+
         action_bar = ctk.CTkFrame(self.mod_tab, fg_color="transparent")
         action_bar.pack(fill="x", pady=(10, 0))
 
@@ -775,7 +3562,6 @@ class JK2ModManager(ctk.CTk):
         )
         self.lbl_status.pack(fill="x", pady=(5, 0))
 
-        self.tree.bind("<<TreeviewSelect>>", self.on_mod_selected)
         self.tree.bind("<Button-3>", self.show_context_menu)
         self.tree.bind("<Double-1>", lambda e: self.toggle_selected_mods_and_status())
 
@@ -796,7 +3582,7 @@ class JK2ModManager(ctk.CTk):
         search_entry.bind("<KeyRelease>", self.on_download_search_key_release)
 
         self.btn_refresh_downloads = ctk.CTkButton(
-            top_bar, text="Refresh List", command=self.refresh_download_list,
+            top_bar, text="Refresh List", command=lambda: self.refresh_download_list(force=True),
             fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB,
             font=ctk.CTkFont(size=12), corner_radius=8
         )
@@ -836,6 +3622,45 @@ class JK2ModManager(ctk.CTk):
         self.download_tree.column("date", width=80, anchor="center")
         self.download_tree.column("preview", width=80, anchor="center")
 
+        self.download_queue_frame = ctk.CTkFrame(
+            self.download_frame, fg_color=COLOR_SCROLL_TROUGH, corner_radius=8
+        )
+        self.download_queue_frame.pack(fill="x")
+
+        queue_bar = ctk.CTkFrame(self.download_queue_frame, fg_color="transparent")
+        queue_bar.pack(fill="x", padx=5, pady=(5, 0))
+        ctk.CTkLabel(
+            queue_bar, text="Download Queue", font=ctk.CTkFont(size=12, weight="bold")
+        ).pack(side="left", padx=5)
+        for text, command in (
+            ("Clear Finished", self.clear_finished_downloads),
+            ("Remove", self.remove_selected_downloads),
+            ("Resume", self.resume_selected_downloads),
+            ("Pause", self.pause_selected_downloads),
+        ):
+            ctk.CTkButton(
+                queue_bar, text=text, width=90, command=command,
+                fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB,
+                font=ctk.CTkFont(size=12), corner_radius=8
+            ).pack(side="right", padx=(5, 0))
+
+        queue_tree_frame = ctk.CTkFrame(self.download_queue_frame, fg_color=COLOR_SCROLL_TROUGH)
+        queue_tree_frame.pack(fill="x", padx=2, pady=(5, 2))
+        queue_scroll = ttk.Scrollbar(queue_tree_frame, style="Custom.Vertical.TScrollbar")
+        queue_scroll.pack(side="right", fill="y")
+        self.download_queue_tree = ttk.Treeview(
+            queue_tree_frame, columns=("name", "state", "progress", "speed", "eta"),
+            show="headings", height=4, yscrollcommand=queue_scroll.set
+        )
+        queue_scroll.config(command=self.download_queue_tree.yview)
+        self.download_queue_tree.pack(fill="x", expand=True)
+        for column, text, width in (
+            ("name", "Name", 250), ("state", "State", 80), ("progress", "Progress", 150),
+            ("speed", "Speed", 90), ("eta", "ETA", 70)
+        ):
+            self.download_queue_tree.heading(column, text=text)
+            self.download_queue_tree.column(column, width=width, anchor="w" if column == "name" else "center")
+
         self.download_progress_frame = ctk.CTkFrame(
             self.download_frame, fg_color="transparent"
         )
@@ -993,19 +3818,33 @@ class JK2ModManager(ctk.CTk):
                 self.show_error("Config Error", "Configuration file is corrupt or unreadable. Using default settings.")
         return {"profiles": {"Default": {"mod_folder": "", "game_exe": ""}}, "active_profile": "Default"}
 
+    def setting(self, key: str):
+        return self.config.get(key, USER_SETTINGS[key])
+
     def save_config(self):
         self.config = {
             "geometry": self.geometry(),
             "profiles": self.profiles,
             "active_profile": self.active_profile,
-            "appearance_mode": "Dark"
+            "appearance_mode": "Dark",
+            **{key: self.config[key] for key in USER_SETTINGS if key in self.config}
         }
         if self.active_profile and self.active_profile in self.profiles:
-            self.profiles[self.active_profile].update({
+            profile = self.profiles[self.active_profile]
+            profile.update({
                 "devmode": self.devmode_var.get(),
                 "logfile": self.logfile_var.get(),
                 "custom_params": self.custom_params_var.get()
             })
+            # While a profile's mod set is being applied the folder is in
+            # flux and must not overwrite the stored set. The set is read from
+            # disk because the mod list may still be waiting on the catalog.
+            if self.mod_folder and not self.profile_loading and profile.get("mod_folder") == str(self.mod_folder):
+                try:
+                    profile["enabled_mods"] = sorted(scan_mod_names(self.mod_folder))
+                    profile["disabled_mods"] = sorted(scan_mod_names(self.mod_folder / DISABLED_DIR_NAME))
+                except OSError as e:
+                    logging.warning(f"Could not read enabled mods from {self.mod_folder}: {e}")
         try:
             with open(CONFIG_FILE, "w") as f:
                 json.dump(self.config, f, indent=4)
@@ -1025,6 +3864,13 @@ class JK2ModManager(ctk.CTk):
                         self.game_process.kill()
             except Exception as e:
                 logging.error(f"Failed to terminate game process: {e}")
+        if self.folder_watcher:
+            self.folder_watcher.stop()
+        self.preview_pool.shutdown(wait=False, cancel_futures=True)
+        self.index_pool.shutdown(wait=False, cancel_futures=True)
+        self.file_ops.shutdown(wait=False, cancel_futures=True)
+        self.downloads.shutdown()
+        self.stop_preview_pregeneration()
         self.save_config()
         self.destroy()
 
@@ -1042,6 +3888,7 @@ class JK2ModManager(ctk.CTk):
             self.change_profile_event(names[0])
 
     def change_profile_event(self, new_profile: str):
+        self.save_config()
         self.active_profile = new_profile
         self.load_profile_folder()
         self.update_status()
@@ -1115,12 +3962,61 @@ class JK2ModManager(ctk.CTk):
         self.logfile_var.set(profile.get("logfile", False))
         self.custom_params_var.set(profile.get("custom_params", ""))
         if folder_str and os.path.exists(folder_str):
-            self.set_mod_folder(Path(folder_str))
+            folder = Path(folder_str)
+            if profile.get("enabled_mods") is not None:
+                self.profile_loading = True
+                self._submit_file_op(
+                    self._profile_mods_worker, folder,
+                    set(profile["enabled_mods"]), set(profile.get("disabled_mods", [])),
+                    cleanup=lambda: self._show_profile_folder(folder, [], [])
+                )
+            else:
+                self._show_profile_folder(folder, [], [])
         else:
             self.path_var.set("Base folder path missing or invalid for this profile.")
             self.mod_folder = None
+            self.restart_folder_watcher()
             self.refresh_list()
 
+    def recover_file_operations(self):
+        record = self.journal.pending()
+        if record is None:
+            return
+        finish = self.ask_yesno(
+            "Interrupted Operation",
+            f"A batch of {len(record['ops'])} file operations was interrupted.\nFinish it? Choose No to undo it."
+        )
+        try:
+            repaired = self.journal.recover(roll_back=not finish)
+            logging.info(f"Recovered interrupted file operations: {repaired} repaired")
+        except Exception as e:
+            logging.error(f"Failed to recover file operations: {e}")
+            self.show_error("Recovery Error", f"Could not recover interrupted file operations: {e}")
+
+    def _profile_mods_worker(self, folder: Path, wanted: set[str], unwanted: set[str]):
+        changes, errors = self._apply_enabled_mods(folder, wanted, unwanted)
+        self.after(0, lambda: self._show_profile_folder(folder, changes, errors))
+
+    def _show_profile_folder(self, folder: Path, changes: list[tuple], errors: list[str]):
+        self.profile_loading = False
+        if folder == self.mod_folder:
+            self._apply_mod_changes(folder, changes)
+        elif self.profiles.get(self.active_profile, {}).get("mod_folder") == str(folder):
+            self.set_mod_folder(folder)
+        if errors:
+            self._report_errors("Profile", f"{len(errors)} mods could not be toggled:", errors)
+
+    def _apply_enabled_mods(self, folder: Path, wanted: set[str], unwanted: set[str]) -> tuple[list[tuple], list[str]]:
+        # Only mods whose state differs are renamed; names present in both
+        # folders are left alone rather than overwritten. Mods the profile
+        # has never seen, such as server autodownloads that arrived while the
+        # app was closed, stay where they are.
+        disabled_dir = folder / DISABLED_DIR_NAME
+        enabled, disabled = scan_mod_names(folder), scan_mod_names(disabled_dir)
+        moves = [(folder / name, disabled_dir / name) for name in sorted((enabled & unwanted) - wanted - disabled)]
+        moves += [(disabled_dir / name, folder / name) for name in sorted((wanted & disabled) - enabled)]
+        return self._move_mods(moves)
+
     def browse_folder(self):
         default_path = Path.home()
         if os.name == 'nt':
@@ -1133,6 +4029,8 @@ class JK2ModManager(ctk.CTk):
             self.set_mod_folder(path_obj)
             if self.active_profile:
                 self.profiles[self.active_profile]["mod_folder"] = path_str
+                self.profiles[self.active_profile].pop("enabled_mods", None)
+                self.profiles[self.active_profile].pop("disabled_mods", None)
                 self.save_config()
                 self.update_status()
 
@@ -1145,8 +4043,28 @@ class JK2ModManager(ctk.CTk):
                 disabled.mkdir()
             except Exception as e:
                 logging.error(f"Failed to create disabled directory: {e}")
+        self.restart_folder_watcher()
+        if self.pregeneration_job:
+            self.after_cancel(self.pregeneration_job)
+            self.pregeneration_job = None
+        self.stop_preview_pregeneration()
+        # Started once the catalog reconcile has filled in the mod list.
+        self.pregeneration_folder = path_obj
         self.refresh_list()
 
+    def restart_folder_watcher(self):
+        if self.folder_watcher:
+            self.folder_watcher.stop()
+            self.folder_watcher = None
+        if not self.mod_folder:
+            return
+        folder = self.mod_folder
+        self.folder_watcher = FolderWatcher(
+            folder, self.catalog,
+            lambda changes: self.after(0, lambda: self._apply_mod_changes(folder, changes))
+        )
+        self.folder_watcher.start()
+
     def open_in_explorer(self):
         if not self.mod_folder:
             return
@@ -1160,62 +4078,206 @@ class JK2ModManager(ctk.CTk):
         except Exception as e:
             self.show_error("Error", f"Could not open folder: {e}")
 
-    def _clear_treeview(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
+    def _make_mod_entry(self, path: Path, size: int, enabled: bool) -> dict:
+        size_mb = size / (1024 * 1024)
+        return {
+            "path": path,
+            "enabled": enabled,
+            "size": f"{size_mb:.2f} MB",
+            "sort_key": path.name.lower()
+        }
+
+    def _mod_order_key(self, path: Path) -> tuple[str, int, str]:
+        return (path.name.lower(), 0 if path.parent == self.mod_folder else 1, path.name)
 
     def _collect_mods(self) -> list[dict]:
         mods = []
-        search = self.search_var.get().lower()
 
         def collect(base: Path, enabled: bool):
-            if not base.exists():
-                return
-            try:
-                for f in base.iterdir():
-                    if not f.is_file():
-                        continue
-                    if f.name in PROTECTED_ASSETS:
-                        continue
-                    if f.suffix.lower() != ".pk3":
-                        continue
-                    if search and search not in f.name.lower():
-                        continue
-                    size_mb = f.stat().st_size / (1024 * 1024)
-                    mods.append({
-                        "path": f,
-                        "enabled": enabled,
-                        "size": f"{size_mb:.2f} MB",
-                        "sort_key": f.name.lower()
-                    })
-            except Exception as e:
-                logging.error(f"Error collecting mods: {e}")
+            for name, (size, _, _) in self.catalog.listing(base).items():
+                if name in PROTECTED_ASSETS:
+                    continue
+                mods.append(self._make_mod_entry(base / name, size, enabled))
 
         if self.mod_folder:
             collect(self.mod_folder, True)
             collect(self.mod_folder / DISABLED_DIR_NAME, False)
 
-        mods.sort(key=lambda m: m["sort_key"])
+        mods.sort(key=lambda m: self._mod_order_key(m["path"]))
         return mods
 
+    def _lookup_mod(self, path: Path) -> dict | None:
+        if not self.mod_folder or path.name in PROTECTED_ASSETS:
+            return None
+        if path.parent == self.mod_folder:
+            enabled = True
+        elif path.parent == self.mod_folder / DISABLED_DIR_NAME:
+            enabled = False
+        else:
+            return None
+        info = self.catalog.lookup(path)
+        if info is None:
+            return None
+        return self._make_mod_entry(path, info[0], enabled)
+
+    def _mod_row(self, mod: dict) -> tuple[tuple, tuple]:
+        status_text = "ENABLED" if mod["enabled"] else "DISABLED"
+        tag = "enabled" if mod["enabled"] else "disabled"
+        return (mod["size"], status_text, mod["path"].name), (tag,)
+
     def _populate_treeview(self, mods: list[dict]):
-        self.mod_index.clear()
-        for i, mod in enumerate(mods):
-            iid = f"mod_{i}"
-            self.mod_index[iid] = mod["path"]
-            status_text = "ENABLED" if mod["enabled"] else "DISABLED"
-            tag = "enabled" if mod["enabled"] else "disabled"
-            self.tree.insert("", "end", iid=iid, values=(mod["size"], status_text, mod["path"].name), tags=(tag,))
+        self.mod_entries = {str(mod["path"]): mod for mod in mods}
+        self.mod_all_order = [(self._mod_order_key(mod["path"]), str(mod["path"])) for mod in mods]
+        self.mod_search.rebuild({key: mod["path"].name for key, mod in self.mod_entries.items()})
+        self._apply_mod_filter()
+        enabled = [mod["path"] for mod in mods if mod["enabled"]]
+        self._submit_index_job(self.conflicts.sync, enabled)
+        self._submit_index_job(self.file_search.sync, [mod["path"] for mod in mods])
+
+    def _apply_mod_filter(self):
+        self.mod_search_job = None
+        hits = self.mod_search.search(self._mod_filter_text())
+        keys = [key for _, key in self.mod_all_order if hits is None or key in hits]
+        self.mod_index = {key: self.mod_entries[key]["path"] for key in keys}
+        self.mod_order = [self._mod_order_key(path) for path in self.mod_index.values()]
+        self.mod_list.set_rows(keys, {key: self._mod_row(self.mod_entries[key]) for key in keys})
+        self.update_status()
+
+    def _searching_files(self) -> bool:
+        return self.search_mode_var.get() == "Files"
+
+    def _mod_filter_text(self) -> str:
+        return "" if self._searching_files() else self.search_var.get()
+
+    def _matches_mod_search(self, name: str) -> bool:
+        search = self._mod_filter_text().lower()
+        return not search or search in name.lower()
+
+    def _sync_mod_row(self, path: Path):
+        iid = str(path)
+        mod = self._lookup_mod(path)
+        order_key = self._mod_order_key(path)
+        pos = bisect.bisect_left(self.mod_all_order, (order_key, iid))
+        if iid in self.mod_entries:
+            del self.mod_all_order[pos]
+            del self.mod_entries[iid]
+            self.mod_search.remove(iid)
+        if mod is not None:
+            self.mod_all_order.insert(pos, (order_key, iid))
+            self.mod_entries[iid] = mod
+            self.mod_search.add(iid, path.name)
+
+        if mod is None or not self._matches_mod_search(path.name):
+            if iid in self.mod_index:
+                del self.mod_index[iid]
+                pos = bisect.bisect_left(self.mod_order, order_key)
+                if pos < len(self.mod_order) and self.mod_order[pos] == order_key:
+                    del self.mod_order[pos]
+                    self.mod_list.delete(pos)
+            return
+        if iid in self.mod_index:
+            self.mod_list.update(iid, self._mod_row(mod))
+            return
+        pos = bisect.bisect_left(self.mod_order, order_key)
+        self.mod_order.insert(pos, order_key)
+        self.mod_index[iid] = path
+        self.mod_list.insert(pos, iid, self._mod_row(mod))
+
+    def _apply_mod_changes(self, folder: Path, changes: list[tuple]):
+        if folder != self.mod_folder:
+            return
+        for change in changes:
+            if change[0] == "moved":
+                self.mod_list.rename(str(change[1]), str(change[2]))
+        removed, added, gone, present = [], [], [], []
+        for path in {path for change in changes for path in change[1:]}:
+            self._sync_mod_row(path)
+            mod = self.mod_entries.get(str(path))
+            (present if mod else gone).append(path)
+            if mod and mod["enabled"]:
+                added.append(path)
+            elif path.parent == self.mod_folder:
+                removed.append(path.name)
+        if removed or added:
+            self._submit_index_job(self.conflicts.update, removed, added)
+        if gone or present:
+            self._submit_index_job(self.file_search.update, gone, present)
+        self.update_status()
+
+    def _submit_index_job(self, job, *args):
+        future = self.index_pool.submit(job, *args)
+
+        def done(future):
+            if not future.cancelled() and future.exception():
+                logging.error(f"Index update failed: {future.exception()}", exc_info=future.exception())
+            self.after(0, self._refresh_conflict_summary)
+
+        future.add_done_callback(done)
+
+    def _submit_file_op(self, worker, *args, cleanup=None):
+        # Workers report per-file errors themselves; anything that escapes
+        # them (journal writes, catalog updates) would otherwise vanish in the
+        # future and leave the UI stuck in its busy state.
+        future = self.file_ops.submit(worker, *args)
+
+        def done(future):
+            if future.cancelled() or future.exception() is None:
+                return
+            error = future.exception()
+            logging.error(f"File operation failed: {error}", exc_info=error)
+
+            def report():
+                if cleanup:
+                    cleanup()
+                self.set_processing_state(False)
+                self.show_error("Error", f"File operation failed: {error}")
+                self.refresh_list()
+
+            self.after(0, report)
+
+        future.add_done_callback(done)
 
     def refresh_list(self):
-        self._clear_treeview()
+        self._render_mod_list()
+        self.reconcile_catalog_threaded()
+
+    def _render_mod_list(self):
         mods = self._collect_mods()
         self._populate_treeview(mods)
         self.auto_adjust_columns()
-        self.update_status()
+
+    def reconcile_catalog_threaded(self):
+        if not self.mod_folder:
+            return
+        if self.catalog_reconcile_running:
+            self.catalog_reconcile_pending = True
+            return
+        self.catalog_reconcile_running = True
+        folder = self.mod_folder
+        threading.Thread(target=self._reconcile_catalog_worker, args=(folder,), daemon=True).start()
+
+    def _reconcile_catalog_worker(self, folder: Path):
+        changes = []
+        try:
+            changes = self.catalog.reconcile([folder, folder / DISABLED_DIR_NAME])
+        except Exception as e:
+            logging.error(f"Catalog reconcile failed: {e}")
+        self.after(0, lambda: self._reconcile_catalog_done(folder, changes))
+
+    def _reconcile_catalog_done(self, folder: Path, changes: list[tuple]):
+        self.catalog_reconcile_running = False
+        if changes:
+            self._apply_mod_changes(folder, changes)
+        if self.catalog_reconcile_pending:
+            self.catalog_reconcile_pending = False
+            self.reconcile_catalog_threaded()
+        elif folder == self.mod_folder == self.pregeneration_folder:
+            self.pregeneration_folder = None
+            self.pregeneration_job = self.after(PREGENERATION_DELAY_MS, self.start_preview_pregeneration)
 
     def auto_adjust_columns(self):
-        if not self.tree.get_children():
+        rows = self.mod_list.rows.values()
+        if not rows:
             self.tree.column("size", width=100, stretch=tk.NO)
             self.tree.column("status", width=100, stretch=tk.NO)
             self.tree.column("priority", width=400, stretch=tk.YES)
@@ -1226,11 +4288,8 @@ class JK2ModManager(ctk.CTk):
             "size": len(self.tree.heading("size", option="text")) * PIXEL_PER_CHAR,
             "status": len(self.tree.heading("status", option="text")) * PIXEL_PER_CHAR,
         }
-        for iid in self.tree.get_children():
-            values = self.tree.item(iid, 'values')
-            if len(values) >= 3:
-                widths["size"] = max(widths["size"], len(values[0]) * PIXEL_PER_CHAR)
-                widths["status"] = max(widths["status"], len(values[1]) * PIXEL_PER_CHAR)
+        widths["size"] = max(widths["size"], max(len(values[0]) for values, _ in rows) * PIXEL_PER_CHAR)
+        widths["status"] = max(widths["status"], max(len(values[1]) for values, _ in rows) * PIXEL_PER_CHAR)
         self.tree.column("size", width=max(100, widths["size"] + padding), stretch=tk.NO)
         self.tree.column("status", width=max(100, widths["status"] + padding), stretch=tk.NO)
         self.tree.column("priority", minwidth=400, width=400, stretch=tk.YES)
@@ -1243,37 +4302,53 @@ class JK2ModManager(ctk.CTk):
         disabled_count = sum(1 for p in self.mod_index.values() if p.parent == (self.mod_folder / DISABLED_DIR_NAME))
         self.status_var.set(f"Profile: {self.active_profile} | Enabled: {enabled_count} | Disabled: {disabled_count} | Total: {enabled_count + disabled_count}")
 
-    def toggle_mod_action(self, path: Path, target_state: str | None = None) -> bool:
-        if not self.mod_folder:
-            return False
-        is_enabled = path.parent == self.mod_folder
-        if target_state == "enable" and is_enabled:
-            return False
-        if target_state == "disable" and not is_enabled:
-            return False
-        target_dir = self.mod_folder if not is_enabled else self.mod_folder / DISABLED_DIR_NAME
-        dest = target_dir / path.name
-        try:
-            target_dir.mkdir(parents=True, exist_ok=True)
-            if os.name != 'nt':
-                path.chmod(path.stat().st_mode | stat.S_IWUSR)
-            path.rename(dest)
-            return True
-        except Exception as e:
-            self.show_error("Toggle Error", f"Failed to move {path.name}: {e}")
-            return False
+    def _toggle_target(self, path: Path) -> Path:
+        if path.parent == self.mod_folder:
+            return self.mod_folder / DISABLED_DIR_NAME / path.name
+        return self.mod_folder / path.name
+
+    def _move_mods(self, moves: list[tuple[Path, Path]]) -> tuple[list[tuple], list[str]]:
+        changes, errors = [], []
+        for op, error in self.journal.run([("move", src, dst) for src, dst in moves]):
+            if error:
+                errors.append(f"{op[1].name}: {error}")
+            else:
+                changes.append(("moved", op[1], op[2]))
+        moved = [change[1:] for change in changes]
+        self.catalog.record_moves(moved)
+        self.archive_index.record_moves(moved)
+        return changes, errors
 
     def toggle_selected_mods_and_status(self, force: str | None = None):
-        if not self.tree.selection():
+        if not self.mod_folder or self.toggle_running:
             return
-        success = True
-        for iid in self.tree.selection():
-            if iid in self.mod_index:
-                if not self.toggle_mod_action(self.mod_index[iid], force):
-                    success = False
-        self.refresh_list()
-        if not success:
-            self.show_error("Error", "Some mods failed to toggle.")
+        moves = []
+        for iid in self.mod_list.selection():
+            path = self.mod_index.get(iid)
+            if path is None:
+                continue
+            is_enabled = path.parent == self.mod_folder
+            if (force == "enable" and is_enabled) or (force == "disable" and not is_enabled):
+                continue
+            moves.append((path, self._toggle_target(path)))
+        if not moves:
+            return
+        self.toggle_running = True
+        self.set_processing_state(True)
+        self._submit_file_op(
+            self._toggle_worker, self.mod_folder, moves, cleanup=lambda: setattr(self, "toggle_running", False)
+        )
+
+    def _toggle_worker(self, folder: Path, moves: list[tuple[Path, Path]]):
+        changes, errors = self._move_mods(moves)
+        self.after(0, lambda: self._toggle_done(folder, changes, errors))
+
+    def _toggle_done(self, folder: Path, changes: list[tuple], errors: list[str]):
+        self.toggle_running = False
+        self.set_processing_state(False)
+        self._apply_mod_changes(folder, changes)
+        if errors:
+            self._report_errors("Toggle Error", f"{len(errors)} of {len(changes) + len(errors)} mods failed to toggle:", errors)
 
     def install_mods_threaded(self):
         if not self.mod_folder:
@@ -1281,28 +4356,149 @@ class JK2ModManager(ctk.CTk):
         files = self.ask_open_files(title="Select PK3 Files", filetypes=[("PK3", "*.pk3")])
         if not files:
             return
+        sources = {Path(f).name: Path(f) for f in files}
+        collisions = sorted((name for name in sources if (self.mod_folder / name).exists()), key=str.lower)
+        if collisions:
+            overwrite = self.ask_overwrite(collisions)
+            if overwrite is None:
+                return
+            for name in collisions:
+                if name not in overwrite:
+                    del sources[name]
+        if not sources:
+            return
+        planned = [(source, self.mod_folder / name) for name, source in sources.items()]
         self.set_processing_state(True)
-        threading.Thread(target=self._install_worker, args=(files,), daemon=True).start()
+        self._submit_file_op(self._install_worker, planned)
+
+    def ask_overwrite(self, names: list[str]) -> set[str] | None:
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("")
+        dialog.transient(self)
+        dialog.geometry("450x400")
+
+        dialog.update_idletasks()
+        x = (dialog.winfo_screenwidth() - 450) // 2
+        y = (dialog.winfo_screenheight() - 400) // 2
+        dialog.geometry(f"+{x}+{y}")
+
+        frame = ctk.CTkFrame(dialog)
+        frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        ctk.CTkLabel(
+            frame, text=f"{len(names)} mods already exist. Overwrite the checked ones?",
+            font=ctk.CTkFont(size=12)
+        ).pack(pady=(0, 10))
+
+        list_frame = ctk.CTkScrollableFrame(frame, fg_color=COLOR_SCROLL_TROUGH)
+        list_frame.pack(fill="both", expand=True)
+        choices = {}
+        for name in names:
+            var = ctk.BooleanVar(value=True)
+            ctk.CTkCheckBox(
+                list_frame, text=name, variable=var, onvalue=True, offvalue=False,
+                font=ctk.CTkFont(size=12), checkbox_height=18, checkbox_width=18
+            ).pack(anchor="w", pady=2)
+            choices[name] = var
+
+        button_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        button_frame.pack(fill="x", pady=(10, 0))
+
+        def set_all(value: bool):
+            for var in choices.values():
+                var.set(value)
+
+        ctk.CTkButton(
+            button_frame, text="Cancel", width=80,
+            command=lambda: self._dialog_response(dialog, False),
+            fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB, corner_radius=8
+        ).pack(side="right", padx=5)
+        ctk.CTkButton(
+            button_frame, text="Install", width=80,
+            command=lambda: self._dialog_response(dialog, True),
+            fg_color=COLOR_ACCENT, hover_color=COLOR_PRIMARY, corner_radius=8
+        ).pack(side="right", padx=5)
+        ctk.CTkButton(
+            button_frame, text="None", width=60, command=lambda: set_all(False),
+            fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB, corner_radius=8
+        ).pack(side="left", padx=5)
+        ctk.CTkButton(
+            button_frame, text="All", width=60, command=lambda: set_all(True),
+            fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB, corner_radius=8
+        ).pack(side="left", padx=5)
 
-    def _install_worker(self, files: list[str]):
+        dialog.wait_visibility()
+        dialog.grab_set()
+        dialog.focus_set()
+        self.wait_window(dialog)
+        if not getattr(dialog, "response", False):
+            return None
+        return {name for name, var in choices.items() if var.get()}
+
+    def _install_worker(self, planned: list[tuple[Path, Path]]):
         count, errors = 0, 0
-        target_dir = self.mod_folder
-        for i, f_path_str in enumerate(files):
-            self.after(0, lambda: self.status_var.set(f"Installing... ({i+1}/{len(files)})"))
-            f = Path(f_path_str)
+        changes = []
+        total = 0
+        for source, _ in planned:
             try:
-                if (target_dir / f.name).exists():
-                    if not self.ask_yesno("Overwrite?", f"'{f.name}' already exists. Overwrite?"):
-                        continue
-                shutil.copy2(f, target_dir / f.name)
-                count += 1
-            except Exception as e:
-                logging.error(f"Failed to install {f.name}: {e}")
+                total += source.stat().st_size
+            except OSError:
+                pass
+
+        def report(done: int, total: int, rate: float):
+            mb = 1024 * 1024
+            self.after(0, lambda: self.status_var.set(
+                f"Installing... {done / mb:.0f}/{total / mb:.0f} MB at {rate / mb:.1f} MB/s"
+            ))
+
+        meter = TransferProgress(total, report)
+        if self.setting("mod_store"):
+            # Store installs are links swapped in with os.replace, so each
+            # one is already atomic and needs no journal entry.
+            def install(item):
+                try:
+                    self._install_to_store(*item, meter.add)
+                    return ("copy", *item), None
+                except Exception as e:
+                    logging.error(f"Failed to install {item[0].name}: {e}")
+                    return ("copy", *item), e
+
+            with concurrent.futures.ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+                results = list(pool.map(install, planned))
+        else:
+            results = self.journal.run([("copy", f, target) for f, target in planned], on_bytes=meter.add)
+        for op, error in results:
+            if error:
                 errors += 1
-        self.after(0, lambda: self._op_complete(f"Installed {count} mods ({errors} errors)."))
+                continue
+            self.catalog.record_add(op[2])
+            changes.append(("added", op[2]))
+            count += 1
+        self.after(0, lambda: self._op_complete(f"Installed {count} mods ({errors} errors).", changes))
+
+    def _install_to_store(self, source: Path, target: Path, progress=None):
+        mode = self.setting("mod_store_link")
+        digest = get_sha256_hash(source)
+        if digest != "ERROR" and self.mod_store.contains(digest):
+            self.mod_store.materialize(digest, target, mode)
+            if progress:
+                progress(source.stat().st_size)
+        else:
+            part = target.with_name(f".{target.name}.part")
+            part.unlink(missing_ok=True)
+            try:
+                copy_file(source, part, progress)
+                os.replace(part, target)
+            except Exception:
+                part.unlink(missing_ok=True)
+                raise
+            if digest != "ERROR":
+                self.mod_store.ingest(target, digest, mode)
+        if digest != "ERROR":
+            self.catalog.store_hashes([(target, target.stat(), digest)])
 
     def delete_selected_threaded(self):
-        items = self.tree.selection()
+        items = self.mod_list.selection()
         if not items:
             return
         valid_items = [iid for iid in items if iid in self.mod_index]
@@ -1311,17 +4507,23 @@ class JK2ModManager(ctk.CTk):
         if not self.ask_yesno("Delete", f"Permanently delete {len(valid_items)} file(s)?"):
             return
         self.set_processing_state(True)
-        threading.Thread(target=self._delete_worker, args=(valid_items,), daemon=True).start()
+        paths = [self.mod_index[iid] for iid in valid_items]
+        self._submit_file_op(self._delete_worker, paths)
 
-    def _delete_worker(self, items: list[str]):
+    def _delete_worker(self, paths: list[Path]):
         count = 0
-        for iid in items:
-            try:
-                self.mod_index[iid].unlink()
+        changes = []
+        for op, error in self.journal.run([("delete", path) for path in paths]):
+            if error is None:
+                self.catalog.record_remove(op[1])
+                changes.append(("removed", op[1]))
                 count += 1
+        if count and self.setting("mod_store"):
+            try:
+                self.mod_store.collect_garbage(self._profile_folders())
             except Exception as e:
-                logging.error(f"Failed to delete {self.mod_index[iid].name}: {e}")
-        self.after(0, lambda: self._op_complete(f"Deleted {count} files."))
+                logging.warning(f"Mod store cleanup failed: {e}")
+        self.after(0, lambda: self._op_complete(f"Deleted {count} files.", changes))
 
     def start_game_threaded(self):
         if not self.game_exe_path or not Path(self.game_exe_path).exists():
@@ -1351,16 +4553,19 @@ class JK2ModManager(ctk.CTk):
                 params.extend(custom.split())
             command = [str(exe_path)] + params
             self.game_process = subprocess.Popen(command, cwd=str(exe_path.parent))
-            self.after(0, lambda: self._op_complete("Game launched successfully."))
+            self.after(0, lambda: self._op_complete("Game launched successfully.", []))
         except Exception as e:
             error_msg = f"Failed to launch game: {e}"
             self.after(0, lambda: self.show_error("Launch Error", error_msg))
             self.after(0, lambda: self.set_processing_state(False))
 
-    def _op_complete(self, msg: str):
+    def _op_complete(self, msg: str, changes: list[tuple] | None = None):
         self.set_processing_state(False)
         self.status_var.set(msg)
-        self.refresh_list()
+        if changes is None:
+            self.refresh_list()
+        elif self.mod_folder:
+            self._apply_mod_changes(self.mod_folder, changes)
 
     def set_processing_state(self, is_processing: bool):
         state = "disabled" if is_processing else "normal"
@@ -1369,11 +4574,12 @@ class JK2ModManager(ctk.CTk):
         self.btn_enable.configure(state=state)
         self.btn_disable.configure(state=state)
         self.btn_delete_mod.configure(state=state)
+        self.btn_duplicates.configure(state=state)
         self.btn_refresh_downloads.configure(state=state)
         self.btn_download_selected.configure(state=state)
 
     def rename_mod_dialog(self):
-        sel = self.tree.selection()
+        sel = self.mod_list.selection()
         if not sel:
             return
         iid = sel[0]
@@ -1388,109 +4594,294 @@ class JK2ModManager(ctk.CTk):
         if not re.match(r'^[a-zA-Z0-9_\-\.]+\.pk3$', new_name):
             self.show_error("Error", "Invalid filename.")
             return
-        try:
-            path.rename(path.parent / new_name)
-            self.refresh_list()
-        except Exception as e:
-            self.show_error("Error", str(e))
+        folder = self.mod_folder
+        self._submit_file_op(self._rename_worker, folder, path, path.parent / new_name)
+
+    def _rename_worker(self, folder: Path, path: Path, dest: Path):
+        changes, errors = self._move_mods([(path, dest)])
+        self.after(0, lambda: self._apply_mod_changes(folder, changes))
+        if errors:
+            self.after(0, lambda: self.show_error("Error", errors[0]))
 
     def export_json(self):
         if not self.mod_folder:
             return
-        filename = self.ask_save_file(title="Export JSON", defaultextension=".json", filetypes=[("JSON", "*.json")])
+        filename = self.ask_save_file(
+            title="Export Mod List", defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("NDJSON", "*.ndjson"), ("CSV", "*.csv")]
+        )
         if not filename:
             return
-        mod_list = []
-        self._load_order_counter = 1
+        fmt = EXPORT_FORMATS.get(Path(filename).suffix.lower(), "json")
+        self.set_processing_state(True)
+        threading.Thread(target=self._export_worker, args=(self.mod_folder, filename, fmt), daemon=True).start()
+
+    def _export_worker(self, mod_folder: Path, filename: str, fmt: str):
+        def report(count: int):
+            if count % 16 == 0:
+                self.after(0, lambda: self.status_var.set(f"Exporting... ({count} mods)"))
 
-        def collect_dir_data(base: Path, status: str):
-            if not base.exists():
-                return
-            sorted_files = sorted(base.iterdir(), key=lambda p: p.name.lower())
-            for fpath in sorted_files:
-                if fpath.suffix.lower() == ".pk3":
-                    if fpath.name in PROTECTED_ASSETS:
-                        continue
-                    file_stats = fpath.stat()
-                    size_bytes = file_stats.st_size
-                    size_mb = size_bytes / (1024 * 1024)
-                    file_hash = get_sha256_hash(fpath)
-                    raw_timestamp = file_stats.st_mtime
-                    formatted_time = datetime.datetime.fromtimestamp(raw_timestamp).strftime('%Y-%m-%d %H:%M:%S')
-                    current_order = self._load_order_counter
-                    self._load_order_counter += 1
-                    mod_list.append({
-                        "name": fpath.name,
-                        "status": status,
-                        "load_order": current_order,
-                        "size_mb": size_mb,
-                        "path": str(fpath),
-                        "sha256": file_hash,
-                        "last_modified": formatted_time
-                    })
-
-        collect_dir_data(self.mod_folder, "Enabled")
-        collect_dir_data(self.mod_folder / DISABLED_DIR_NAME, "Disabled")
         try:
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(mod_list, f, indent=4)
-            self.show_info("Exported", f"List saved to {filename}")
+            # Let queued conflict updates land before reading the index.
+            self.index_pool.submit(lambda: None).result()
+            records = iter_export_records(mod_folder, self.catalog, self.conflicts)
+            with open(filename, "w", encoding="utf-8", newline="" if fmt == "csv" else None) as f:
+                count = write_export(records, f, fmt, report)
+            self.after(0, lambda: self._op_complete(f"Exported {count} mods.", []))
+            self.after(0, lambda: self.show_info("Exported", f"List saved to {filename}"))
         except Exception as e:
-            self.show_error("Export Error", f"Failed to save JSON: {e}")
+            error_msg = f"Failed to export list: {e}"
+            self.after(0, lambda: self.set_processing_state(False))
+            self.after(0, lambda: self.show_error("Export Error", error_msg))
 
-    def fetch_mod_list(self):
-        try:
-            encoded_parts = [
-                "aHR0cHM6Ly9qazJ0",
-                "LmRkbnMubmV0L21v",
-                "ZG1hbmFnZXIvbW9k",
-                "cy5qc29u"
-            ]
-            encoded_url = "".join(encoded_parts)
-            api_url = base64.b64decode(encoded_url).decode("utf-8")
+    def _profile_folders(self) -> list[Path]:
+        folders = [Path(profile["mod_folder"]) for profile in self.profiles.values() if profile.get("mod_folder")]
+        if self.mod_folder:
+            folders.insert(0, self.mod_folder)
+        return [folder for folder in dict.fromkeys(folders) if folder.is_dir()]
+
+    def _report_errors(self, title: str, message: str, errors: list[str]):
+        summary = "\n".join(errors[:5])
+        if len(errors) > 5:
+            summary += f"\n...and {len(errors) - 5} more"
+        self.show_error(title, f"{message}\n{summary}")
+
+    def find_duplicates_threaded(self):
+        folders = self._profile_folders()
+        if not folders:
+            return self.show_error("Error", "Select Base Folder first.")
+        self.set_processing_state(True)
+        threading.Thread(target=self._find_duplicates_worker, args=(folders,), daemon=True).start()
 
-            if not api_url:
-                raise ValueError("API URL is not set.")
+    def _find_duplicates_worker(self, folders: list[Path]):
+        def report(stage: str, done: int, total: int):
+            if done % 16 == 0 or done == total:
+                self.after(0, lambda: self.status_var.set(f"{stage} for duplicates... ({done}/{total})"))
 
-            response = requests.get(api_url, timeout=5)
-            response.raise_for_status()
-            return response.json()
+        try:
+            groups = find_duplicate_groups(iter_dedupe_candidates(folders), self.catalog, report)
+            self.after(0, lambda: self._show_duplicates(groups))
         except Exception as e:
-            self.show_error("Download Error", f"Failed to fetch mod list: {e}")
-            return []
+            error_msg = f"Failed to scan for duplicates: {e}"
+            self.after(0, lambda: self.set_processing_state(False))
+            self.after(0, lambda: self.show_error("Duplicates Error", error_msg))
+
+    def _show_duplicates(self, groups: list[tuple[str, int, list[Path]]]):
+        self.set_processing_state(False)
+        self.update_status()
+        if not groups:
+            self.show_info("Duplicates", "No duplicate mods found.")
+            return
+
+        lines = []
+        reclaimable = 0
+        for digest, size, paths in groups:
+            inodes = set()
+            for path in paths:
+                try:
+                    st = path.stat()
+                    inodes.add((st.st_dev, st.st_ino))
+                except OSError:
+                    pass
+            reclaimable += size * max(0, len(inodes) - 1)
+            linked = " (already linked)" if len(inodes) == 1 else ""
+            lines.append(f"{size / (1024 * 1024):.2f} MB  sha256 {digest[:12]}{linked}")
+            lines.extend(f"    {path}" for path in paths)
+            lines.append("")
+
+        dialog = ctk.CTkToplevel(self)
+        dialog.title("Duplicate Mods")
+        dialog.transient(self)
+        dialog.geometry("750x500")
+
+        main_frame = ctk.CTkFrame(dialog, fg_color=COLOR_SCROLL_TROUGH)
+        main_frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        ctk.CTkLabel(
+            main_frame,
+            text=f"{len(groups)} duplicate groups, {reclaimable / (1024 * 1024):.2f} MB reclaimable",
+            font=ctk.CTkFont(size=14, weight="bold"), text_color=COLOR_TEXT_BRIGHT
+        ).pack(pady=(10, 10))
+
+        text = CTkTextbox(main_frame, state="normal", fg_color=DARK_BG_COLOR, text_color=COLOR_TEXT_BRIGHT)
+        text.pack(fill="both", expand=True, padx=5, pady=5)
+        text.insert("1.0", "\n".join(lines))
+        text.configure(state="disabled")
+
+        button_frame = ctk.CTkFrame(main_frame, fg_color="transparent")
+        button_frame.pack(fill="x", pady=(0, 10))
+
+        ctk.CTkButton(
+            button_frame, text="Close", width=100, command=dialog.destroy,
+            fg_color=COLOR_SCROLL_TROUGH, hover_color=COLOR_SCROLL_THUMB, corner_radius=8
+        ).pack(side="right", padx=5)
+        for mode, label in (("reflink", "Reflink Copies"), ("hardlink", "Hardlink Copies")):
+            ctk.CTkButton(
+                button_frame, text=label, width=130,
+                command=lambda mode=mode: self._start_dedupe(dialog, groups, mode),
+                fg_color=COLOR_ACCENT, hover_color=COLOR_PRIMARY, corner_radius=8
+            ).pack(side="right", padx=5)
+
+    def _start_dedupe(self, dialog, groups: list[tuple[str, int, list[Path]]], mode: str):
+        if not self.ask_yesno("Deduplicate", f"Replace duplicate copies with {mode}s to the first file of each group?"):
+            return
+        dialog.destroy()
+        self.set_processing_state(True)
+        self._submit_file_op(self._dedupe_worker, groups, mode)
+
+    def _dedupe_worker(self, groups: list[tuple[str, int, list[Path]]], mode: str):
+        def report(done: int, total: int):
+            self.after(0, lambda: self.status_var.set(f"Deduplicating... ({done}/{total})"))
+
+        linked, reclaimed, errors = link_duplicate_groups(groups, mode, self.catalog, report)
+        msg = f"Replaced {linked} duplicates with {mode}s, reclaimed {reclaimed / (1024 * 1024):.2f} MB."
+        self.after(0, lambda: self._op_complete(msg, None))
+        if errors:
+            self.after(0, lambda: self._report_errors("Deduplicate", f"{len(errors)} files could not be replaced:", errors))
+
+    def on_mod_store_toggled(self):
+        enabled = self.mod_store_var.get()
+        self.config["mod_store"] = enabled
+        self.save_config()
+        if not enabled:
+            return
+        folders = self._profile_folders()
+        if folders and self.ask_yesno("Shared Mod Store", (
+            "Move the mods of all profiles into the shared store now?\n"
+            "Linked mods are shared, so editing one in place changes it in every profile."
+        )):
+            self.set_processing_state(True)
+            self._submit_file_op(self._store_import_worker, folders)
+
+    def _store_import_worker(self, folders: list[Path]):
+        mode = self.setting("mod_store_link")
+        count, errors, hashed = 0, [], []
+        for path, _, st, digest in iter_file_hashes(((path, None) for path in iter_dedupe_candidates(folders)), self.catalog):
+            if digest == "ERROR":
+                errors.append(f"{path.name}: could not be hashed")
+                continue
+            try:
+                self.mod_store.ingest(path, digest, mode)
+                hashed.append((path, path.stat(), digest))
+                count += 1
+            except Exception as e:
+                logging.error(f"Failed to store {path}: {e}")
+                errors.append(f"{path.name}: {e}")
+            if count % 16 == 0:
+                self.after(0, lambda: self.status_var.set(f"Storing mods... ({count})"))
+        self.catalog.store_hashes(hashed)
+        self.mod_store.collect_garbage(folders)
+        self.after(0, lambda: self._op_complete(f"Stored {count} mods in the shared store.", None))
+        if errors:
+            self.after(0, lambda: self._report_errors("Shared Mod Store", f"{len(errors)} files could not be stored:", errors))
+
+    def clone_profile(self):
+        if not self.active_profile or not self.mod_folder:
+            return self.show_error("Error", "Select Base Folder first.")
+        name = self.ask_string("Clone Profile", "Name for the cloned profile:", initialvalue=f"{self.active_profile} Copy")
+        if not name:
+            return
+        if name in self.profiles:
+            self.show_error("Error", "Profile name already exists.")
+            return
+        path_str = filedialog.askdirectory(parent=self, title="Select Base Folder for the Clone")
+        if not path_str:
+            return
+        target = Path(path_str)
+        if target.resolve() == self.mod_folder.resolve():
+            self.show_error("Error", "The clone needs a different Base Folder.")
+            return
+        self.save_config()
+        profile = {**self.profiles[self.active_profile], "mod_folder": str(target)}
+        self.set_processing_state(True)
+        self._submit_file_op(self._clone_profile_worker, name, profile, self.mod_folder, target)
+
+    def _clone_profile_worker(self, name: str, profile: dict, source: Path, target: Path):
+        # With the store every mod becomes a link; without it a hardlink is
+        # tried first and a real copy is only made across filesystems.
+        use_store = self.setting("mod_store")
+        mode = self.setting("mod_store_link")
+        count, errors, hashed = 0, [], []
+        items = iter_mod_files(source)
+        if use_store:
+            items = iter_file_hashes(items, self.catalog)
+        else:
+            items = ((path, status, None, None) for path, status in items)
+        for path, status, _, digest in items:
+            dest = (target if status == "Enabled" else target / DISABLED_DIR_NAME) / path.name
+            try:
+                if use_store and digest != "ERROR":
+                    self.mod_store.ingest(path, digest, mode)
+                    if dest.exists() and not self.mod_store.is_linked(dest, digest):
+                        raise FileExistsError("a different file with this name already exists")
+                    self.mod_store.materialize(digest, dest, mode)
+                    hashed.append((dest, dest.stat(), digest))
+                elif dest.exists():
+                    raise FileExistsError("already exists in the clone")
+                else:
+                    dest.parent.mkdir(parents=True, exist_ok=True)
+                    try:
+                        os.link(path, dest)
+                    except OSError:
+                        shutil.copy2(path, dest)
+                count += 1
+            except Exception as e:
+                logging.error(f"Failed to clone {path.name}: {e}")
+                errors.append(f"{path.name}: {e}")
+            if count % 16 == 0:
+                self.after(0, lambda: self.status_var.set(f"Cloning profile... ({count})"))
+        self.catalog.store_hashes(hashed)
+        self.after(0, lambda: self._clone_profile_done(name, profile, count, errors))
+
+    def _clone_profile_done(self, name: str, profile: dict, count: int, errors: list[str]):
+        self.set_processing_state(False)
+        self.profiles[name] = profile
+        self.active_profile = name
+        self.refresh_profile_dropdown()
+        self.load_profile_folder()
+        self.save_config()
+        self.status_var.set(f"Cloned {count} mods into profile '{name}'.")
+        if errors:
+            self._report_errors("Clone Profile", f"{len(errors)} mods could not be cloned:", errors)
 
-    def refresh_download_list(self):
-        self.refresh_download_list_threaded()
-
-    def refresh_download_list_threaded(self):
-        threading.Thread(target=self._refresh_download_list_worker, daemon=True).start()
-
-    def _refresh_download_list_worker(self):
-        mods = self.fetch_mod_list()
-        search_term = self.download_search_var.get().lower()
-
-        if search_term:
-            scored_mods = []
-            for mod in mods:
-                score = 0
-                if search_term in mod["name"].lower():
-                    score += 4
-                if search_term in mod.get("category", "").lower():
-                    score += 3
-                if search_term in mod.get("author", "").lower():
-                    score += 2
-                if search_term in mod.get("uploader", "").lower():
-                    score += 1
-
-                if score > 0:
-                    scored_mods.append((score, mod))
-
-            scored_mods.sort(key=lambda x: (-x[0], x[1]["name"].lower()))
-            mods = [mod for score, mod in scored_mods]
+    def fetch_mod_list(self, force: bool = False) -> list[dict]:
+        try:
+            self.mod_database.refresh(force)
+        except Exception as e:
+            if not self.mod_database.mods:
+                self.show_error("Download Error", f"Failed to fetch mod list: {e}")
+            else:
+                logging.warning(f"Mod database refresh failed, using cached copy: {e}")
+        return self.mod_database.mods
+
+    def refresh_download_list(self, force: bool = False):
+        if self.mod_database.mods:
+            self._apply_download_filter()
+        self.refresh_download_list_threaded(force)
+
+    def refresh_download_list_threaded(self, force: bool = False):
+        threading.Thread(target=self._refresh_download_list_worker, args=(force,), daemon=True).start()
+
+    def _refresh_download_list_worker(self, force: bool = False):
+        version = self.mod_database.version
+        self.fetch_mod_list(force)
+        # Build the search index here so the first keystroke does not pay for it.
+        self.download_search.ensure(*self.mod_database.snapshot())
+        if self.mod_database.version != version:
+            self.after(0, self._apply_download_filter)
+
+    def _apply_download_filter(self):
+        self.download_search_job = None
+        mods, version = self.mod_database.snapshot()
+        search_term = self.download_search_var.get()
+
+        if search_term.strip():
+            self.download_search.ensure(mods, version)
+            mods = self.download_search.search(search_term) or []
         else:
-            mods.sort(key=lambda x: x.get("date", ""), reverse=True)
+            mods = sorted(mods, key=lambda x: x.get("date", ""), reverse=True)
 
-        self.after(0, lambda: self._populate_download_treeview(mods))
+        self._populate_download_treeview(mods)
 
     def _clear_download_treeview(self):
         for i in self.download_tree.get_children():
@@ -1528,38 +4919,93 @@ class JK2ModManager(ctk.CTk):
             return self.show_error("Error", "Select Base Folder first.")
 
         for iid in selected:
-            mod_url = iid
             mod_name = self.download_tree.item(iid, "values")[0]
-            self.set_processing_state(True)
-            self.status_var.set(f"Downloading {mod_name}...")
-            threading.Thread(
-                target=self._download_mod_worker,
-                args=(mod_url, mod_name),
-                daemon=True
-            ).start()
-
-    def _download_mod_worker(self, mod_url, mod_name):
-        try:
-            response = requests.get(mod_url, stream=True, timeout=10)
-            response.raise_for_status()
-            total_size = int(response.headers.get('content-length', 0))
-            save_path = self.mod_folder / f"{mod_name}.pk3"
-            downloaded = 0
-            with open(save_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    progress = downloaded / total_size if total_size > 0 else 0
-                    percent = int(progress * 100)
-                    self.after(0, lambda: self.download_progress.set(progress))
-                    self.after(0, lambda: self.download_progress_percent.configure(text=f"{percent}%"))
-            self.after(0, lambda: self._op_complete(f"Downloaded {mod_name} successfully!"))
-        except Exception as e:
-            self.after(0, lambda: self.show_error("Download Error", f"Failed to download {mod_name}: {e}"))
-            self.after(0, lambda: self.set_processing_state(False))
-        finally:
-            self.after(0, lambda: self.download_progress.set(0))
-            self.after(0, lambda: self.download_progress_percent.configure(text="Download Complete"))
+            self.downloads.enqueue(iid, self.mod_folder / f"{mod_name}.pk3", mod_name)
+        self.status_var.set(f"Queued {len(selected)} downloads.")
+
+    def pause_selected_downloads(self):
+        for url in self.download_queue_tree.selection():
+            self.downloads.pause(url)
+
+    def resume_selected_downloads(self):
+        for url in self.download_queue_tree.selection():
+            self.downloads.resume(url)
+
+    def remove_selected_downloads(self):
+        for url in self.download_queue_tree.selection():
+            if self.downloads.remove(url):
+                with self.download_updates_lock:
+                    self.download_updates.pop(url, None)
+                self.download_queue_tree.delete(url)
+        self._update_download_totals()
+
+    def clear_finished_downloads(self):
+        for item in self.downloads.remove_finished():
+            if self.download_queue_tree.exists(item.url):
+                self.download_queue_tree.delete(item.url)
+        self._update_download_totals()
+
+    def _on_download_update(self, item: DownloadItem):
+        # Called from download threads; coalesce into one Tk callback per item.
+        with self.download_updates_lock:
+            first = not self.download_updates
+            self.download_updates[item.url] = item
+        if first:
+            self.after(0, self._flush_download_updates)
+
+    def _flush_download_updates(self):
+        with self.download_updates_lock:
+            items = list(self.download_updates.values())
+            self.download_updates.clear()
+        mb = 1024 * 1024
+        tree = self.download_queue_tree
+        for item in items:
+            # A worker's last update can land after its row was removed.
+            if self.downloads.items.get(item.url) is not item:
+                continue
+            if item.total:
+                progress = f"{item.done / mb:.1f}/{item.total / mb:.1f} MB"
+            else:
+                progress = f"{item.done / mb:.1f} MB" if item.done else ""
+            speed = f"{item.rate / mb:.1f} MB/s" if item.state == "active" and item.rate else ""
+            eta = item.eta()
+            eta_text = f"{int(eta) // 60}:{int(eta) % 60:02d}" if eta is not None else ""
+            state = item.state if not item.error else f"failed: {item.error}"
+            values = (item.name, state, progress, speed, eta_text)
+            if tree.exists(item.url):
+                tree.item(item.url, values=values)
+            else:
+                tree.insert("", "end", iid=item.url, values=values)
+        self._update_download_totals()
+
+    def _update_download_totals(self):
+        done, total, rate = self.downloads.totals()
+        counts = self.downloads.counts()
+        self.download_progress.set(done / total if total else 0)
+        if counts["active"] or counts["queued"]:
+            self.download_progress_percent.configure(
+                text=f"{counts['active']} active, {counts['queued']} queued at {rate / (1024 * 1024):.1f} MB/s"
+            )
+        else:
+            self.download_progress_percent.configure(
+                text=f"{counts['done']} done, {counts['failed']} failed, {counts['paused']} paused"
+            )
+
+    def _on_download_finished(self, item: DownloadItem):
+        if item.state == "done":
+            self.catalog.record_add(item.target)
+        self.after(0, lambda: self._download_finished(item))
+
+    def _download_finished(self, item: DownloadItem):
+        if item.state == "done":
+            self.status_var.set(f"Downloaded {item.name} successfully!")
+            if self.mod_folder and item.target.parent == self.mod_folder:
+                self._apply_mod_changes(self.mod_folder, [("added", item.target)])
+        else:
+            self.download_errors.append(f"{item.name}: {item.error}")
+        if self.downloads.is_idle() and self.download_errors:
+            errors, self.download_errors = self.download_errors, []
+            self._report_errors("Download Error", f"{len(errors)} downloads failed:", errors)
 
     def on_download_mod_selected(self, event):
         selected = self.download_tree.selection()
@@ -1568,11 +5014,8 @@ class JK2ModManager(ctk.CTk):
         iid = selected[0]
         mod_url = iid
         mod_name = self.download_tree.item(iid, "values")[0]
-        preview_url = None
-        for mod in self.fetch_mod_list():
-            if mod["download_url"] == mod_url:
-                preview_url = mod.get("preview_image")
-                break
+        mod = self.mod_database.get(mod_url)
+        preview_url = mod.get("preview_image") if mod else None
         if preview_url:
             self._load_preview_image(preview_url)
         else:
@@ -1601,16 +5044,105 @@ class JK2ModManager(ctk.CTk):
         threading.Thread(target=worker, daemon=True).start()
 
     def on_mod_search_key_release(self, event):
-        if hasattr(self, 'search_timer') and self.search_timer:
-            self.search_timer.cancel()
-        self.search_timer = Timer(0.5, lambda: self.refresh_list())
-        self.search_timer.start()
+        if self._searching_files():
+            if self.file_search_job:
+                self.after_cancel(self.file_search_job)
+            self.file_search_job = self.after(300, self._run_file_search)
+            return
+        if self.mod_search_job:
+            self.after_cancel(self.mod_search_job)
+        self.mod_search_job = self.after(150, self._apply_mod_filter)
+
+    def on_search_mode_changed(self, mode: str):
+        self.lbl_search.configure(text="Search Files:" if mode == "Files" else "Search Mods:")
+        self._apply_mod_filter()
+        if mode == "Files" and self.search_var.get().strip():
+            self._run_file_search()
+
+    def _run_file_search(self):
+        if self.file_search_job:
+            self.after_cancel(self.file_search_job)
+        self.file_search_job = None
+        query = self.search_var.get()
+        if not query.strip():
+            return
+        self.file_search_generation += 1
+        generation = self.file_search_generation
+        threading.Thread(target=self._file_search_worker, args=(query, generation), daemon=True).start()
+
+    def _file_search_worker(self, query: str, generation: int):
+        try:
+            results, truncated = self.file_search.search(query)
+        except Exception as e:
+            logging.error(f"File search failed: {e}")
+            results, truncated = [], False
+        self.after(0, lambda: self._show_file_results(generation, query, results, truncated))
+
+    def _show_file_results(self, generation: int, query: str, results: list[tuple[str, str]], truncated: bool):
+        if generation != self.file_search_generation:
+            return
+        if not self.file_results_window or not self.file_results_window.winfo_exists():
+            self._create_file_results_window()
+        summary = f"{len(results)} files matching '{query.strip()}'"
+        if truncated:
+            summary = f"First {len(results)} files matching '{query.strip()}'"
+        self.file_results_window.title(summary)
+        self.file_results_label.configure(text=summary)
+        self.file_results = results
+        tree = self.file_results_tree
+        tree.delete(*tree.get_children())
+        for i, (key, inner) in enumerate(results):
+            mod = self.mod_entries.get(key)
+            state = "ENABLED" if mod and mod["enabled"] else "DISABLED"
+            tree.insert("", "end", iid=str(i), values=(inner, Path(key).name, state))
+
+    def _create_file_results_window(self):
+        dialog = ctk.CTkToplevel(self)
+        dialog.transient(self)
+        dialog.geometry("800x450")
+        self.file_results_window = dialog
+
+        frame = ctk.CTkFrame(dialog, fg_color=COLOR_SCROLL_TROUGH)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        self.file_results_label = ctk.CTkLabel(
+            frame, text="", font=ctk.CTkFont(size=12, weight="bold"), text_color=COLOR_TEXT_BRIGHT
+        )
+        self.file_results_label.pack(anchor="w", padx=5, pady=(5, 5))
+
+        tree_frame = ctk.CTkFrame(frame, fg_color=COLOR_SCROLL_TROUGH)
+        tree_frame.pack(fill="both", expand=True)
+        scroll = ttk.Scrollbar(tree_frame, style="Custom.Vertical.TScrollbar")
+        scroll.pack(side="right", fill="y")
+        tree = ttk.Treeview(
+            tree_frame, columns=("file", "mod", "status"), show="headings",
+            selectmode="browse", yscrollcommand=scroll.set
+        )
+        scroll.config(command=tree.yview)
+        tree.heading("file", text="File", anchor="w")
+        tree.heading("mod", text="Mod", anchor="w")
+        tree.heading("status", text="State", anchor="w")
+        tree.column("file", width=450, stretch=tk.YES)
+        tree.column("mod", width=220, stretch=tk.NO)
+        tree.column("status", width=90, stretch=tk.NO)
+        tree.pack(fill="both", expand=True, padx=2, pady=2)
+        tree.bind("<<TreeviewSelect>>", self.on_file_result_selected)
+        self.file_results_tree = tree
+
+    def on_file_result_selected(self, event=None):
+        selection = self.file_results_tree.selection()
+        if not selection:
+            return
+        key = self.file_results[int(selection[0])][0]
+        if key in self.mod_index:
+            self.mod_list.select([key])
+        else:
+            self.status_var.set(f"{Path(key).name} is no longer in the mod list.")
 
     def on_download_search_key_release(self, event):
-        if hasattr(self, 'search_timer') and self.search_timer:
-            self.search_timer.cancel()
-        self.search_timer = Timer(0.5, self.refresh_download_list_threaded)
-        self.search_timer.start()
+        if self.download_search_job:
+            self.after_cancel(self.download_search_job)
+        self.download_search_job = self.after(150, self._apply_download_filter)
 
     def load_rcon_saved_servers(self):
         self.rcon_config.read(RCON_CONFIG_FILE)
@@ -1702,8 +5234,8 @@ class JK2ModManager(ctk.CTk):
             self.after(0, lambda: self.rcon_input_entry.delete(0, tk.END))
 
     # UI Helpers
-    def on_mod_selected(self, event):
-        selection = self.tree.selection()
+    def on_mod_selected(self, event=None):
+        selection = self.mod_list.selection()
         if not selection:
             return
         mod_name = selection[0]
@@ -1711,99 +5243,171 @@ class JK2ModManager(ctk.CTk):
         if mod_path and mod_path.suffix.lower() == ".pk3":
             self.update_preview(mod_path)
         else:
+            self.preview_generation += 1
             self.preview_canvas.configure(image=None, text="No Preview Available")
+        self._refresh_conflict_summary()
 
-    def update_preview(self, pk3_path: Path):
-        try:
-            with zipfile.ZipFile(pk3_path, 'r') as z:
-                img_exts = {'.jpg', '.jpeg', '.png', '.tga'}
-                best_match = None
-                max_score = -20000
-
-                folder_weights = {
-                    'levelshots/': 10000,
-                    'models/players/': 400,
-                    'models/weapons2/': 300,
-                    'models/map_objects/mp/': 200,
-                    'gfx/menus/': 100,
-                    'gfx/ui/': 50
-                }
-
-                for name in z.namelist():
-                    if name.endswith('/') or any(x in name.lower() for x in ['__macosx', 'thumbs.db']):
-                        continue
+    def _selected_mod_path(self) -> Path | None:
+        selection = self.mod_list.selection()
+        return self.mod_index.get(selection[0]) if selection else None
 
-                    full_path_lower = name.lower()
-                    base_name = os.path.basename(name).lower()
-                    name_no_ext, ext = os.path.splitext(base_name)
+    def _refresh_conflict_summary(self):
+        mod_path = self._selected_mod_path()
+        if not mod_path or mod_path.parent != self.mod_folder:
+            self.lbl_conflicts.configure(text="Disabled mods do not conflict." if mod_path else "")
+            self.btn_conflicts.configure(state="disabled")
+            return
+        wins, losses = self.conflicts.report(mod_path.name)
+        if not wins and not losses:
+            self.lbl_conflicts.configure(text="No file conflicts.")
+            self.btn_conflicts.configure(state="disabled")
+            return
+        self.lbl_conflicts.configure(text=f"Overrides {len(wins)} files | Overridden: {len(losses)} files")
+        self.btn_conflicts.configure(state="normal")
 
-                    if ext not in img_exts:
-                        continue
+    def show_conflicts(self):
+        mod_path = self._selected_mod_path()
+        if not mod_path:
+            return
+        wins, losses = self.conflicts.report(mod_path.name)
+        lines = [f"Overrides ({len(wins)}):"]
+        lines += [f"  {inner}  (over {', '.join(losers)})" for inner, losers in wins]
+        lines += ["", f"Overridden ({len(losses)}):"]
+        lines += [f"  {inner}  (by {winner})" for inner, winner in losses]
 
-                    score = 1
-
-                    for folder, weight in folder_weights.items():
-                        if folder in full_path_lower:
-                            score += weight
-                            break
-
-                    if name_no_ext == 'preview':
-                        score += 1600
-                    elif name_no_ext == 'icon_default':
-                        score += 1500
-                    elif name_no_ext == 'levelshot':
-                        score += 1000
-                    elif name_no_ext.startswith('map_'):
-                        score += 400
-
-                    team_keywords = ['icon_blue', 'icon_red', 'icon_green', '/team/', '_blue', '_red']
-                    if any(k in full_path_lower for k in team_keywords):
-                        score -= 800
-
-                    trash_keywords = [
-                        'eye', 'mouth', 'face', 'hand', 'torso', 'arm', 'leg', 
-                        'hips', 'cap', '_glow', '_spec', '_norm', '_reflect'
-                    ]
-                    if any(k in name_no_ext for k in trash_keywords):
-                        score -= 15000 
-
-                    if ext.lower() in ['.jpg', '.jpeg']:
-                        score += 10
-
-                    if score > max_score:
-                        max_score = score
-                        best_match = name
-
-                if best_match:
-                    with z.open(best_match) as img_file:
-                        img_data = io.BytesIO(img_file.read())
-                        try:
-                            img = Image.open(img_data)
-                        except Exception as img_error:
-                            logging.error(f"Failed to open image {best_match}: {img_error}")
-                            self.preview_canvas.configure(image=None, text="Invalid Image")
-                            return
-                        
-                        if img.mode in ("RGBA", "P", "LA"):
-                            img = img.convert("RGBA")
-                        elif img.mode != "RGB":
-                            img = img.convert("RGB")
-
-                        p_width = max(self.preview_box.winfo_width() - 20, 100)
-                        ratio = p_width / float(img.size[0])
-                        p_height = int(float(img.size[1]) * ratio)
-
-                        img = img.resize((p_width, p_height), Image.Resampling.LANCZOS)
-                        ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=(p_width, p_height))
-
-                        self.preview_canvas.configure(image=ctk_img, text="")
-                        self.preview_canvas.image = ctk_img
-                else:
-                    self.preview_canvas.configure(image=None, text="No Preview Found")
+        dialog = ctk.CTkToplevel(self)
+        dialog.title(f"File Conflicts - {mod_path.name}")
+        dialog.transient(self)
+        dialog.geometry("700x500")
+
+        frame = ctk.CTkFrame(dialog, fg_color=COLOR_SCROLL_TROUGH)
+        frame.pack(fill="both", expand=True, padx=10, pady=10)
+
+        text = CTkTextbox(frame, state="normal", fg_color=DARK_BG_COLOR, text_color=COLOR_TEXT_BRIGHT)
+        text.pack(fill="both", expand=True, padx=5, pady=5)
+        text.insert("1.0", "\n".join(lines))
+        text.configure(state="disabled")
+
+        ctk.CTkButton(
+            frame, text="Close", width=100, command=dialog.destroy,
+            fg_color=COLOR_ACCENT, hover_color=COLOR_PRIMARY, corner_radius=8
+        ).pack(pady=(5, 0))
+
+    def update_preview(self, pk3_path: Path):
+        self.preview_generation += 1
+        p_width = max(self.preview_box.winfo_width() - 20, 100)
+        self.preview_pool.submit(self._preview_worker, pk3_path, p_width, self.preview_generation)
 
+    def _preview_worker(self, pk3_path: Path, p_width: int, generation: int):
+        # Results for a mod that is no longer selected are dropped, both here
+        # before the expensive decode and again on the Tk thread.
+        def show(key=None, img=None, message=None):
+            self.after(0, lambda: self._show_preview(generation, key, img, message))
+
+        try:
+            st = pk3_path.stat()
+            best_match = find_preview_entry(self.archive_index.names(pk3_path), self.preview_scorer)
+            if not best_match:
+                return show(message="No Preview Found")
+            key = ThumbnailCache.make_key(pk3_path, st, best_match, p_width)
+            if key in self.preview_images:
+                return show(key)
+            img = self.thumbnail_cache.get(key)
+            if img is None:
+                if generation != self.preview_generation:
+                    return
+                try:
+                    img = decode_preview_image(self.archive_index.read(pk3_path, best_match), p_width)
+                except Exception as img_error:
+                    logging.error(f"Failed to open image {best_match}: {img_error}")
+                    return show(message="Invalid Image")
+                self.thumbnail_cache.put(key, img)
+            show(key, img)
         except Exception as e:
             logging.error(f"Error processing {pk3_path.name}: {e}")
-            self.preview_canvas.configure(image=None, text="Preview Error")
+            show(message="Preview Error")
+
+    def _show_preview(self, generation: int, key: str | None, img: Image.Image | None, message: str | None):
+        if generation != self.preview_generation:
+            return
+        if message:
+            self.preview_canvas.configure(image=None, text=message)
+            return
+        ctk_img = self.preview_images.get(key)
+        if ctk_img is None:
+            ctk_img = ctk.CTkImage(light_image=img, dark_image=img, size=img.size)
+            self._remember_preview(key, ctk_img)
+        else:
+            self.preview_images.move_to_end(key)
+        self.preview_canvas.configure(image=ctk_img, text="")
+        self.preview_canvas.image = ctk_img
+
+    def start_preview_pregeneration(self):
+        self.pregeneration_job = None
+        self.stop_preview_pregeneration()
+        if not self.mod_folder:
+            return
+        paths = [mod["path"] for mod in self.mod_entries.values()]
+        p_width = max(self.preview_box.winfo_width() - 20, 100)
+        self.pregeneration_stop = threading.Event()
+        threading.Thread(
+            target=self._pregeneration_worker, args=(paths, p_width, self.pregeneration_stop), daemon=True
+        ).start()
+
+    def stop_preview_pregeneration(self):
+        if self.pregeneration_stop:
+            self.pregeneration_stop.set()
+            self.pregeneration_stop = None
+
+    def _game_running(self) -> bool:
+        return bool(self.game_process and self.game_process.poll() is None)
+
+    def _pregeneration_worker(self, paths: list[Path], p_width: int, stop_event: threading.Event):
+        workers = max(1, min(2, (os.cpu_count() or 2) // 2))
+        in_flight = set()
+        generated = 0
+
+        def store(done):
+            nonlocal generated
+            for future in done:
+                if future.cancelled():
+                    continue
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logging.warning(f"Preview pre-generation failed: {e}")
+                    continue
+                if result:
+                    self.thumbnail_cache.put_encoded(*result)
+                    generated += 1
+
+        try:
+            # Forking here would copy Tk, SQLite connections and watcher
+            # threads into the children, so workers are always spawned.
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_pregeneration_worker, initargs=(ARCHIVE_INDEX_FILE,)
+            ) as pool:
+                for pk3_path in paths:
+                    while self._game_running() and not stop_event.is_set():
+                        stop_event.wait(2)
+                    if stop_event.is_set():
+                        break
+                    in_flight.add(pool.submit(pregenerate_preview, pk3_path, p_width, self.preview_scorer))
+                    if len(in_flight) >= workers * 2:
+                        done, in_flight = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                        store(done)
+                for future in in_flight:
+                    future.cancel()
+                store(concurrent.futures.wait(in_flight)[0])
+        except Exception as e:
+            logging.error(f"Preview pre-generation stopped: {e}")
+        logging.info(f"Pre-generated {generated} mod previews.")
+
+    def _remember_preview(self, key: str, ctk_img: ctk.CTkImage):
+        self.preview_images[key] = ctk_img
+        while len(self.preview_images) > PREVIEW_MEMORY_ITEMS:
+            self.preview_images.popitem(last=False)
 
     def create_context_menu(self):
         bg_color = "#16213e"
@@ -1822,10 +5426,10 @@ class JK2ModManager(ctk.CTk):
     def show_context_menu(self, event):
         if hasattr(self, 'context_menu') and self.context_menu:
             self.context_menu.destroy()
-        iid = self.tree.identify_row(event.y)
+        iid = self.mod_list.key_at(event.y)
         if iid:
-            if iid not in self.tree.selection():
-                self.tree.selection_set(iid)
+            if iid not in self.mod_list.selected:
+                self.mod_list.select([iid])
             self.create_context_menu()
             self.context_menu.post(event.x_root, event.y_root)
 
@@ -1974,29 +5578,24 @@ class JK2ModManager(ctk.CTk):
             self.after(0, lambda: self.show_error("Update Failed", "Failed to apply update."))
 
     def download_asset(self, download_url: str, asset_name: str, expected_hash: str | None = None, max_retries=3) -> Path | None:
-        for attempt in range(max_retries):
-            try:
-                response = requests.get(download_url, stream=True, timeout=10)
-                response.raise_for_status()
-
-                temp_file = CONFIG_DIR / f"update_temp_{asset_name.replace('/', '_')}"
-                with open(temp_file, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
+        temp_file = CONFIG_DIR / f"update_temp_{asset_name.replace('/', '_')}"
+        try:
+            fetch_to_file(
+                self.http, download_url, temp_file, retries=max_retries,
+                segments=int(self.setting("download_segments"))
+            )
+        except Exception as e:
+            logging.error(f"Download failed after {max_retries} attempts: {e}")
+            return None
 
-                if expected_hash:
-                    actual_hash = get_sha256_hash(temp_file)
-                    if actual_hash != expected_hash:
-                        logging.error(f"Hash mismatch for {asset_name}. Expected {expected_hash}, got {actual_hash}")
-                        temp_file.unlink(missing_ok=True)
-                        return None
+        if expected_hash:
+            actual_hash = get_sha256_hash(temp_file)
+            if actual_hash != expected_hash:
+                logging.error(f"Hash mismatch for {asset_name}. Expected {expected_hash}, got {actual_hash}")
+                temp_file.unlink(missing_ok=True)
+                return None
 
-                return temp_file
-            except Exception as e:
-                if attempt == max_retries - 1:
-                    logging.error(f"Download failed after {max_retries} attempts: {e}")
-                    return None
-                time.sleep(2)
+        return temp_file
 
     def apply_update(self, temp_file: Path, asset_name: str) -> bool:
         if asset_name.endswith(".dmg"):
@@ -2124,6 +5723,7 @@ class JK2ModManager(ctk.CTk):
             lock_file.unlink(missing_ok=True)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     scaling = get_dpi_scaling()
     ctk.set_widget_scaling(scaling)
     ctk.set_window_scaling(scaling)